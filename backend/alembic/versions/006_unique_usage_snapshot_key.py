@@ -0,0 +1,46 @@
+"""Make usage_snapshots (date, provider, gpu_type) unique
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-01-15 12:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Drop duplicate rows so the unique index can be built (keeps one row per key)
+    op.execute(
+        """
+        DELETE FROM usage_snapshots a
+        USING usage_snapshots b
+        WHERE a.date = b.date
+          AND a.provider = b.provider
+          AND a.gpu_type = b.gpu_type
+          AND a.ctid < b.ctid
+        """
+    )
+    
+    # Unique key lets usage generation upsert with INSERT ... ON CONFLICT
+    op.drop_index('ix_usage_snapshots_date_provider_gpu', table_name='usage_snapshots')
+    op.create_index(
+        'ix_usage_snapshots_date_provider_gpu',
+        'usage_snapshots',
+        ['date', 'provider', 'gpu_type'],
+        unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_usage_snapshots_date_provider_gpu', table_name='usage_snapshots')
+    op.create_index(
+        'ix_usage_snapshots_date_provider_gpu',
+        'usage_snapshots',
+        ['date', 'provider', 'gpu_type']
+    )
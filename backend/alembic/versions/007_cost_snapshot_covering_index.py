@@ -0,0 +1,40 @@
+"""Cover cost_usd in the cost_snapshots (date, provider, gpu_type) index
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-01-16 12:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # INCLUDE cost_usd so date-range SUM(cost_usd) aggregations can be served
+    # by index-only scans; the key columns (and uniqueness) are unchanged
+    op.drop_index('ix_cost_snapshots_date_provider_gpu', table_name='cost_snapshots')
+    op.create_index(
+        'ix_cost_snapshots_date_provider_gpu',
+        'cost_snapshots',
+        ['date', 'provider', 'gpu_type'],
+        unique=True,
+        postgresql_include=['cost_usd']
+    )
+    
+    # Refresh planner statistics for the rebuilt index
+    op.execute("ANALYZE cost_snapshots")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_cost_snapshots_date_provider_gpu', table_name='cost_snapshots')
+    op.create_index(
+        'ix_cost_snapshots_date_provider_gpu',
+        'cost_snapshots',
+        ['date', 'provider', 'gpu_type'],
+        unique=True
+    )
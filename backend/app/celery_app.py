@@ -29,29 +29,15 @@ celery_app.conf.update(
 
 # Celery Beat schedule
 celery_app.conf.beat_schedule = {
-    # Daily summary at 9 AM local time
-    "daily-summary": {
-        "task": "app.tasks.slack_tasks.send_daily_summary_task",
+    # Daily summary, burn rate and idle spend checks together at 9 AM local time.
+    # This is the only Slack schedule: each check covers a whole day and is
+    # deduplicated per day, so running them again later would add nothing.
+    "daily-slack-checks": {
+        "task": "app.tasks.slack_tasks.run_daily_slack_checks",
         "schedule": crontab(
             hour=settings.DAILY_SUMMARY_HOUR or 9,
             minute=0
         ),
     },
-    # Check burn rate every hour (8 AM - 8 PM)
-    "check-burn-rate": {
-        "task": "app.tasks.slack_tasks.check_burn_rate_task",
-        "schedule": crontab(
-            hour="8-20",
-            minute=0
-        ),
-    },
-    # Check idle spend twice daily (10 AM, 4 PM)
-    "check-idle-spend": {
-        "task": "app.tasks.slack_tasks.check_idle_spend_task",
-        "schedule": crontab(
-            hour="10,16",
-            minute=0
-        ),
-    },
 }
 
@@ -2,7 +2,7 @@
 import logging
 from typing import Generator
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, make_url, text
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import QueuePool
 
@@ -15,9 +15,23 @@ settings = get_settings()
 logger = logging.getLogger(__name__)
 
 
+def _connect_args(database_url: str) -> dict:
+    """
+    Driver-specific DBAPI connect arguments.
+    
+    With psycopg 3, prepare_threshold=0 makes every statement server-side
+    prepared on first execution, so the recurring aggregate queries skip
+    parse/plan on reuse. psycopg2 has no equivalent option.
+    """
+    if make_url(database_url).get_driver_name() == "psycopg":
+        return {"prepare_threshold": 0}
+    return {}
+
+
 # Create engine with connection pooling
 engine = create_engine(
     settings.DATABASE_URL,
+    connect_args=_connect_args(settings.DATABASE_URL),
     poolclass=QueuePool,
     pool_size=5,
     max_overflow=10,
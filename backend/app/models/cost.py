@@ -50,7 +50,8 @@ class CostSnapshot(Base, UUIDMixin, TimestampMixin):
         Index(
             "ix_cost_snapshots_date_provider_gpu",
             "date", "provider", "gpu_type",
-            unique=True  # Unique constraint for idempotent upserts
+            unique=True,  # Unique constraint for idempotent upserts
+            postgresql_include=["cost_usd"]  # Index-only scans for cost aggregations
         ),
         Index("ix_cost_snapshots_date", "date"),
     )
@@ -98,11 +99,12 @@ class UsageSnapshot(Base, UUIDMixin, TimestampMixin):
         comment="Number of GPU hours used"
     )
     
-    # Composite index for efficient querying
+    # Composite index and unique constraint for efficient querying and upserts
     __table_args__ = (
         Index(
             "ix_usage_snapshots_date_provider_gpu",
-            "date", "provider", "gpu_type"
+            "date", "provider", "gpu_type",
+            unique=True  # Unique constraint for idempotent upserts
         ),
         Index("ix_usage_snapshots_date", "date"),
     )
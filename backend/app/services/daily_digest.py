@@ -2,9 +2,9 @@
 import logging
 from datetime import date, timedelta
 from decimal import Decimal
-from typing import Dict, List
+from typing import Dict, List, Sequence, Tuple
 
-from sqlalchemy import desc, func, select
+from sqlalchemy import and_, case, desc, func, select
 from sqlalchemy.orm import Session
 
 from app.models.alert_settings import AlertSettings
@@ -42,6 +42,41 @@ class DailyDigestGenerator:
         result = self.db.execute(query).scalar_one_or_none()
         return float(result) if result else 0.0
     
+    def _get_costs_for_periods_bulk(
+        self,
+        ranges: Sequence[Tuple[str, date, date]]
+    ) -> Dict[str, float]:
+        """
+        Get total cost for several periods in a single query.
+        
+        Each period becomes one conditional SUM over the union of the
+        ranges, so the table is scanned once instead of once per period.
+        
+        Args:
+            ranges: (label, start_date, end_date) tuples; dates inclusive
+            
+        Returns:
+            Dict mapping each label to its total cost
+        """
+        if not ranges:
+            return {}
+        
+        query = select(*[
+            func.sum(
+                case(
+                    (and_(CostSnapshot.date >= start, CostSnapshot.date <= end), CostSnapshot.cost_usd),
+                    else_=0
+                )
+            ).label(label)
+            for label, start, end in ranges
+        ]).where(
+            CostSnapshot.date >= min(start for _, start, _ in ranges),
+            CostSnapshot.date <= max(end for _, _, end in ranges)
+        )
+        
+        row = self.db.execute(query).mappings().one()
+        return {label: float(row[label] or 0) for label, _, _ in ranges}
+    
     def _get_top_gpu_types(
         self,
         start_date: date,
@@ -104,13 +139,20 @@ class DailyDigestGenerator:
         week_ago = yesterday - timedelta(days=7)
         month_ago = yesterday - timedelta(days=30)
         
-        # Get global costs (infrastructure-level only)
-        total_daily_cost = self._get_cost_for_period(yesterday, yesterday)
-        total_weekly_cost = self._get_cost_for_period(week_ago, yesterday)
-        total_monthly_cost = self._get_cost_for_period(month_ago, yesterday)
+        # Get global costs (infrastructure-level only) and the previous day
+        # for the daily trend, all in one round trip
+        totals = self._get_costs_for_periods_bulk([
+            ("daily", yesterday, yesterday),
+            ("weekly", week_ago, yesterday),
+            ("monthly", month_ago, yesterday),
+            ("previous_daily", day_before, day_before),
+        ])
+        total_daily_cost = totals["daily"]
+        total_weekly_cost = totals["weekly"]
+        total_monthly_cost = totals["monthly"]
         
         # Calculate daily trend (vs previous day)
-        previous_daily = self._get_cost_for_period(day_before, day_before)
+        previous_daily = totals["previous_daily"]
         daily_change_percent = 0.0
         if previous_daily > 0:
             daily_change_percent = ((total_daily_cost - previous_daily) / previous_daily) * 100
@@ -1,8 +1,10 @@
 """Recommendation engine for Heliox-AI cost optimization."""
+from collections import Counter
 from datetime import date, datetime, time, timedelta
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
 
-from sqlalchemy import func, select
+import numpy as np
+from sqlalchemy import exists, func, lambda_stmt, select
 from sqlalchemy.orm import Session
 
 import logging
@@ -20,6 +22,47 @@ from app.schemas.recommendation import (
 
 logger = logging.getLogger(__name__)
 
+# Severity lookup tables: np.searchsorted(side="right") maps a value to the number
+# of thresholds it meets or exceeds, which indexes into the ladder.
+_SEVERITY_LADDER = (
+    RecommendationSeverity.LOW,
+    RecommendationSeverity.MEDIUM,
+    RecommendationSeverity.HIGH,
+)
+_WASTE_SEVERITY_THRESHOLDS = (50.0, 70.0)  # MEDIUM at 50%, HIGH at 70%
+_RUNTIME_SEVERITY_THRESHOLDS = (48.0, 72.0)  # MEDIUM at 2 days, HIGH at 3 days
+
+# Recommendation.title / .description max_length. Recommendations are built with
+# model_construct, so free text that embeds names is clipped to fit explicitly.
+_TITLE_MAX_LENGTH = 200
+_DESCRIPTION_MAX_LENGTH = 1000
+
+# Rank used for min_severity filtering
+_SEVERITY_ORDER: Dict[RecommendationSeverity, int] = {
+    RecommendationSeverity.LOW: 1,
+    RecommendationSeverity.MEDIUM: 2,
+    RecommendationSeverity.HIGH: 3,
+}
+
+
+def _clip(text: str, max_length: int) -> str:
+    """Shorten text to max_length, marking the cut with an ellipsis."""
+    if len(text) <= max_length:
+        return text
+    return text[:max_length - 1] + "…"
+
+
+def _classify_severities(
+    values: Union[Sequence[float], np.ndarray], thresholds: Tuple[float, ...]
+) -> List[RecommendationSeverity]:
+    """Map a batch of values to severities in one vectorized lookup."""
+    if len(values) == 0:
+        return []
+    severity_idx = np.searchsorted(
+        thresholds, np.asarray(values, dtype=np.float64), side="right"
+    )
+    return [_SEVERITY_LADDER[i] for i in severity_idx]
+
 
 class RecommendationEngine:
     """
@@ -46,6 +89,16 @@ class RecommendationEngine:
         """
         self.db = db
     
+    def _rule_detectors(
+        self,
+    ) -> Tuple[Tuple[RecommendationType, str, Callable[..., List[Recommendation]]], ...]:
+        """Return the detection rules as (type emitted, log label, detector) tuples."""
+        return (
+            (RecommendationType.IDLE_GPU, "idle GPU", self._detect_idle_gpu_spend),
+            (RecommendationType.LONG_RUNNING_JOB, "long-running job", self._detect_long_running_jobs),
+            (RecommendationType.OFF_HOURS_USAGE, "off-hours", self._detect_off_hours_jobs),
+        )
+    
     def generate_recommendations(
         self, filters: RecommendationFilters
     ) -> RecommendationResponse:
@@ -65,34 +118,30 @@ class RecommendationEngine:
         
         recommendations: List[Recommendation] = []
         
+        # Built once and shared by every recommendation's evidence (never mutated)
+        date_range = {
+            "start_date": str(filters.start_date),
+            "end_date": str(filters.end_date),
+        }
+        
         try:
-            # Rule 1: Detect idle GPU spend
-            idle_gpu_recs = self._detect_idle_gpu_spend(
-                filters.start_date, filters.end_date, filters.team_id
-            )
-            recommendations.extend(idle_gpu_recs)
-            logger.info(f"Generated {len(idle_gpu_recs)} idle GPU recommendations")
-            
-            # Rule 2: Detect long-running jobs
-            long_running_recs = self._detect_long_running_jobs(
-                filters.start_date, filters.end_date, filters.team_id
-            )
-            recommendations.extend(long_running_recs)
-            logger.info(f"Generated {len(long_running_recs)} long-running job recommendations")
+            # Each rule is independent of the others (no shared state or data
+            # dependency). Rules whose type is excluded by filters.types are
+            # skipped entirely instead of being queried and filtered out later.
+            wanted_types = set(filters.types) if filters.types else None
+            for rec_type, label, detect in self._rule_detectors():
+                if wanted_types is not None and rec_type not in wanted_types:
+                    continue
+                rule_recs = detect(
+                    filters.start_date, filters.end_date, filters.team_id, date_range
+                )
+                recommendations.extend(rule_recs)
+                logger.info(f"Generated {len(rule_recs)} {label} recommendations")
             
-            # Rule 3: Detect off-hours opportunities
-            off_hours_recs = self._detect_off_hours_jobs(
-                filters.start_date, filters.end_date, filters.team_id
+            # Apply filters, then summarize and total in the same pass
+            recommendations, summary, total_savings = self._filter_and_summarize(
+                recommendations, filters
             )
-            recommendations.extend(off_hours_recs)
-            logger.info(f"Generated {len(off_hours_recs)} off-hours recommendations")
-            
-            # Apply filters
-            recommendations = self._apply_filters(recommendations, filters)
-            
-            # Calculate summary
-            summary = self._calculate_summary(recommendations)
-            total_savings = sum(r.estimated_savings_usd for r in recommendations)
             
             logger.info(
                 f"Generated {len(recommendations)} total recommendations "
@@ -102,10 +151,7 @@ class RecommendationEngine:
             return RecommendationResponse(
                 recommendations=recommendations,
                 summary=summary,
-                date_range={
-                    "start_date": str(filters.start_date),
-                    "end_date": str(filters.end_date),
-                },
+                date_range=date_range,
                 total_estimated_savings_usd=total_savings,
             )
             
@@ -115,15 +161,16 @@ class RecommendationEngine:
             return RecommendationResponse(
                 recommendations=[],
                 summary={"error": str(e)},
-                date_range={
-                    "start_date": str(filters.start_date),
-                    "end_date": str(filters.end_date),
-                },
+                date_range=date_range,
                 total_estimated_savings_usd=0.0,
             )
     
     def _detect_idle_gpu_spend(
-        self, start_date: date, end_date: date, team_id: Optional[str] = None
+        self,
+        start_date: date,
+        end_date: date,
+        team_id: Optional[str] = None,
+        date_range: Optional[Dict[str, str]] = None,
     ) -> List[Recommendation]:
         """
         Detect idle GPU spend by comparing usage hours to expected usage.
@@ -135,16 +182,21 @@ class RecommendationEngine:
             start_date: Start date for analysis
             end_date: End date for analysis
             team_id: Optional team filter
+            date_range: Shared evidence date range; built from the dates if omitted
             
         Returns:
             List of idle GPU recommendations
         """
         recommendations = []
+        if date_range is None:
+            date_range = {"start_date": str(start_date), "end_date": str(end_date)}
         
         try:
-            # Get cost data aggregated by gpu_type and provider
-            cost_stmt = (
-                select(
+            # Get cost data aggregated by gpu_type and provider. Statements are
+            # built as lambda_stmt so the compiled SQL is cached and only the
+            # bound parameters (dates, gpu_type, provider) change between calls.
+            cost_stmt = lambda_stmt(
+                lambda: select(
                     CostSnapshot.gpu_type,
                     CostSnapshot.provider,
                     func.sum(CostSnapshot.cost_usd).label("total_cost"),
@@ -157,12 +209,33 @@ class RecommendationEngine:
                 .group_by(CostSnapshot.gpu_type, CostSnapshot.provider)
             )
             
+            if team_id:
+                # Costs are not attributed to teams, so scope the aggregate to the
+                # (gpu_type, provider) pools the team ran jobs on in this range
+                start_dt, end_dt = self._datetime_bounds(start_date, end_date)
+                cost_stmt += lambda s: s.where(
+                    exists().where(
+                        Job.team_id == team_id,
+                        Job.gpu_type == CostSnapshot.gpu_type,
+                        Job.provider == CostSnapshot.provider,
+                        Job.start_time >= start_dt,
+                        Job.start_time < end_dt,
+                    )
+                )
+            
             cost_results = self.db.execute(cost_stmt).all()
             
-            for gpu_type, provider, total_cost, days_count in cost_results:
+            # Recommendations below are built with model_construct (no validation):
+            # fields come from typed DB columns, enum constants or values normalized
+            # to float here. Title and description embed String(255) names, so they
+            # are clipped to the schema's length limits.
+            
+            actual_usages = []
+            
+            for gpu_type, provider, _, _ in cost_results:
                 # Get usage data for the same GPU type and provider
-                usage_stmt = (
-                    select(func.sum(UsageSnapshot.gpu_hours))
+                usage_stmt = lambda_stmt(
+                    lambda: select(func.sum(UsageSnapshot.gpu_hours))
                     .where(
                         UsageSnapshot.date >= start_date,
                         UsageSnapshot.date <= end_date,
@@ -171,52 +244,68 @@ class RecommendationEngine:
                     )
                 )
                 
-                actual_usage = self.db.execute(usage_stmt).scalar_one_or_none() or 0.0
-                
-                # Estimate expected usage based on cost
-                # Assume 24/7 availability for the period
-                expected_hours_per_day = 24
-                expected_total_hours = days_count * expected_hours_per_day
+                # SUM over a Numeric column comes back as Decimal; normalize to float
+                actual_usages.append(
+                    float(self.db.execute(usage_stmt).scalar_one_or_none() or 0.0)
+                )
+            
+            if not cost_results:
+                return recommendations
+            
+            # Utilization math for every (gpu_type, provider) row in one pass.
+            # Expected usage assumes 24/7 availability for the period.
+            expected_hours_per_day = 24
+            actual = np.array(actual_usages, dtype=np.float64)
+            expected = np.fromiter(
+                (row[3] * expected_hours_per_day for row in cost_results),
+                dtype=np.float64,
+                count=len(cost_results),
+            )
+            has_expected = expected > 0
+            utilization = np.divide(
+                actual, expected, out=np.zeros_like(actual), where=has_expected
+            ) * 100
+            waste = 100 - utilization
+            # Estimate savings (wasted hours * cost per hour)
+            savings = (expected - actual) * self.HOURLY_GPU_COST_ESTIMATE
+            
+            # Flag rows whose utilization is below threshold
+            idle_idx = np.flatnonzero(
+                has_expected & (utilization < self.IDLE_GPU_THRESHOLD_PERCENTAGE)
+            )
+            severities = _classify_severities(waste[idle_idx], _WASTE_SEVERITY_THRESHOLDS)
+            
+            for i, severity in zip(idle_idx, severities):
+                gpu_type, provider, total_cost, _ = cost_results[i]
+                expected_total_hours = float(expected[i])
+                actual_usage = float(actual[i])
+                waste_pct = float(waste[i])
+                estimated_savings = float(savings[i])
                 
-                # Calculate waste percentage
-                if expected_total_hours > 0:
-                    utilization_pct = (actual_usage / expected_total_hours) * 100
-                    waste_pct = 100 - utilization_pct
-                    
-                    # Flag if utilization is below threshold
-                    if utilization_pct < self.IDLE_GPU_THRESHOLD_PERCENTAGE:
-                        # Estimate savings (wasted hours * cost per hour)
-                        wasted_hours = expected_total_hours - actual_usage
-                        estimated_savings = wasted_hours * self.HOURLY_GPU_COST_ESTIMATE
-                        
-                        severity = self._determine_severity_by_waste(waste_pct)
-                        
-                        recommendations.append(
-                            Recommendation(
-                                type=RecommendationType.IDLE_GPU,
-                                title=f"Idle {gpu_type.upper()} GPUs on {provider.upper()}",
-                                description=(
-                                    f"Detected {waste_pct:.1f}% idle GPU capacity on {provider.upper()} "
-                                    f"{gpu_type.upper()} instances. You're paying for {expected_total_hours:.0f} "
-                                    f"hours but only using {actual_usage:.0f} hours. "
-                                    f"Consider scaling down or right-sizing your GPU allocation."
-                                ),
-                                severity=severity,
-                                estimated_savings_usd=round(estimated_savings, 2),
-                                evidence=RecommendationEvidence(
-                                    date_range={
-                                        "start_date": str(start_date),
-                                        "end_date": str(end_date),
-                                    },
-                                    total_cost_usd=float(total_cost),
-                                    expected_usage_hours=expected_total_hours,
-                                    actual_usage_hours=actual_usage,
-                                    waste_percentage=round(waste_pct, 2),
-                                    gpu_type=gpu_type,
-                                    provider=provider,
-                                ),
-                            )
-                        )
+                recommendations.append(
+                    Recommendation.model_construct(
+                        type=RecommendationType.IDLE_GPU,
+                        title=_clip(f"Idle {gpu_type.upper()} GPUs on {provider.upper()}", _TITLE_MAX_LENGTH),
+                        description=_clip(
+                            f"Detected {waste_pct:.1f}% idle GPU capacity on {provider.upper()} "
+                            f"{gpu_type.upper()} instances. You're paying for {expected_total_hours:.0f} "
+                            f"hours but only using {actual_usage:.0f} hours. "
+                            f"Consider scaling down or right-sizing your GPU allocation.",
+                            _DESCRIPTION_MAX_LENGTH
+                        ),
+                        severity=severity,
+                        estimated_savings_usd=round(estimated_savings, 2),
+                        evidence=RecommendationEvidence.model_construct(
+                            date_range=date_range,
+                            total_cost_usd=float(total_cost),
+                            expected_usage_hours=expected_total_hours,
+                            actual_usage_hours=actual_usage,
+                            waste_percentage=round(waste_pct, 2),
+                            gpu_type=gpu_type,
+                            provider=provider,
+                        ),
+                    )
+                )
                         
         except Exception as e:
             logger.error(f"Error detecting idle GPU spend: {e}", exc_info=True)
@@ -224,7 +313,11 @@ class RecommendationEngine:
         return recommendations
     
     def _detect_long_running_jobs(
-        self, start_date: date, end_date: date, team_id: Optional[str] = None
+        self,
+        start_date: date,
+        end_date: date,
+        team_id: Optional[str] = None,
+        date_range: Optional[Dict[str, str]] = None,
     ) -> List[Recommendation]:
         """
         Detect jobs that run for an unusually long time.
@@ -236,71 +329,83 @@ class RecommendationEngine:
             start_date: Start date for analysis
             end_date: End date for analysis
             team_id: Optional team filter
+            date_range: Shared evidence date range; built from the dates if omitted
             
         Returns:
             List of long-running job recommendations
         """
         recommendations = []
+        if date_range is None:
+            date_range = {"start_date": str(start_date), "end_date": str(end_date)}
         
         try:
+            # Compare raw timestamps (not func.date) so the start_time index stays usable
+            start_dt, end_dt = self._datetime_bounds(start_date, end_date)
+            
             # Query for completed jobs with runtime calculation
-            stmt = (
-                select(Job, Team.name)
+            stmt = lambda_stmt(
+                lambda: select(Job, Team.name)
                 .join(Team, Job.team_id == Team.id)
                 .where(
-                    func.date(Job.start_time) >= start_date,
-                    func.date(Job.start_time) <= end_date,
+                    Job.start_time >= start_dt,
+                    Job.start_time < end_dt,
                     Job.end_time.isnot(None),
                     Job.status == "completed",
                 )
             )
             
             if team_id:
-                stmt = stmt.where(Job.team_id == team_id)
+                stmt += lambda s: s.where(Job.team_id == team_id)
             
             results = self.db.execute(stmt).all()
             
+            # First pass: collect long-running jobs so severities can be batched
+            candidates = []
+            
             for job, team_name in results:
                 runtime_delta = job.end_time - job.start_time
                 runtime_hours = runtime_delta.total_seconds() / 3600
                 
                 # Flag if runtime exceeds threshold
                 if runtime_hours > self.LONG_RUNNING_JOB_THRESHOLD_HOURS:
-                    # Estimate potential savings from optimization (e.g., 20% reduction)
-                    potential_reduction_hours = runtime_hours * 0.20
-                    estimated_savings = potential_reduction_hours * self.HOURLY_GPU_COST_ESTIMATE
-                    
-                    severity = self._determine_severity_by_runtime(runtime_hours)
-                    
-                    recommendations.append(
-                        Recommendation(
-                            type=RecommendationType.LONG_RUNNING_JOB,
-                            title=f"Long-running job: {job.model_name} ({team_name})",
-                            description=(
-                                f"Job {job.job_id} ran for {runtime_hours:.1f} hours, "
-                                f"exceeding the {self.LONG_RUNNING_JOB_THRESHOLD_HOURS}h threshold. "
-                                f"Consider optimizing the model training code, using distributed "
-                                f"training, or right-sizing the GPU instance. A 20% reduction "
-                                f"could save approximately ${estimated_savings:.2f}."
-                            ),
-                            severity=severity,
-                            estimated_savings_usd=round(estimated_savings, 2),
-                            evidence=RecommendationEvidence(
-                                date_range={
-                                    "start_date": str(start_date),
-                                    "end_date": str(end_date),
-                                },
-                                job_id=job.job_id,
-                                job_runtime_hours=round(runtime_hours, 2),
-                                job_start_time=job.start_time,
-                                job_end_time=job.end_time,
-                                gpu_type=job.gpu_type,
-                                provider=job.provider,
-                                team_name=team_name,
-                                model_name=job.model_name,
-                            ),
-                        )
+                    candidates.append((job, team_name, runtime_hours))
+            
+            severities = _classify_severities(
+                [candidate[2] for candidate in candidates], _RUNTIME_SEVERITY_THRESHOLDS
+            )
+            
+            for (job, team_name, runtime_hours), severity in zip(candidates, severities):
+                # Estimate potential savings from optimization (e.g., 20% reduction)
+                potential_reduction_hours = runtime_hours * 0.20
+                estimated_savings = potential_reduction_hours * self.HOURLY_GPU_COST_ESTIMATE
+                
+                recommendations.append(
+                    Recommendation.model_construct(
+                        type=RecommendationType.LONG_RUNNING_JOB,
+                        title=_clip(f"Long-running job: {job.model_name} ({team_name})", _TITLE_MAX_LENGTH),
+                        description=_clip(
+                            f"Job {job.job_id} ran for {runtime_hours:.1f} hours, "
+                            f"exceeding the {self.LONG_RUNNING_JOB_THRESHOLD_HOURS}h threshold. "
+                            f"Consider optimizing the model training code, using distributed "
+                            f"training, or right-sizing the GPU instance. A 20% reduction "
+                            f"could save approximately ${estimated_savings:.2f}.",
+                            _DESCRIPTION_MAX_LENGTH
+                        ),
+                        severity=severity,
+                        estimated_savings_usd=round(estimated_savings, 2),
+                        evidence=RecommendationEvidence.model_construct(
+                            date_range=date_range,
+                            job_id=job.job_id,
+                            job_runtime_hours=round(runtime_hours, 2),
+                            job_start_time=job.start_time,
+                            job_end_time=job.end_time,
+                            gpu_type=job.gpu_type,
+                            provider=job.provider,
+                            team_name=team_name,
+                            model_name=job.model_name,
+                        ),
                     )
+                )
                     
         except Exception as e:
             logger.error(f"Error detecting long-running jobs: {e}", exc_info=True)
@@ -308,7 +413,11 @@ class RecommendationEngine:
         return recommendations
     
     def _detect_off_hours_jobs(
-        self, start_date: date, end_date: date, team_id: Optional[str] = None
+        self,
+        start_date: date,
+        end_date: date,
+        team_id: Optional[str] = None,
+        date_range: Optional[Dict[str, str]] = None,
     ) -> List[Recommendation]:
         """
         Detect jobs running during peak business hours (9am-6pm weekdays).
@@ -320,26 +429,32 @@ class RecommendationEngine:
             start_date: Start date for analysis
             end_date: End date for analysis
             team_id: Optional team filter
+            date_range: Shared evidence date range; built from the dates if omitted
             
         Returns:
             List of off-hours scheduling recommendations
         """
         recommendations = []
+        if date_range is None:
+            date_range = {"start_date": str(start_date), "end_date": str(end_date)}
         
         try:
+            # Compare raw timestamps (not func.date) so the start_time index stays usable
+            start_dt, end_dt = self._datetime_bounds(start_date, end_date)
+            
             # Query for jobs that started during business hours
-            stmt = (
-                select(Job, Team.name)
+            stmt = lambda_stmt(
+                lambda: select(Job, Team.name)
                 .join(Team, Job.team_id == Team.id)
                 .where(
-                    func.date(Job.start_time) >= start_date,
-                    func.date(Job.start_time) <= end_date,
+                    Job.start_time >= start_dt,
+                    Job.start_time < end_dt,
                     Job.start_time.isnot(None),
                 )
             )
             
             if team_id:
-                stmt = stmt.where(Job.team_id == team_id)
+                stmt += lambda s: s.where(Job.team_id == team_id)
             
             results = self.db.execute(stmt).all()
             
@@ -375,23 +490,21 @@ class RecommendationEngine:
                     estimated_savings = total_runtime_hours * self.HOURLY_GPU_COST_ESTIMATE * 0.10
                     
                     recommendations.append(
-                        Recommendation(
+                        Recommendation.model_construct(
                             type=RecommendationType.OFF_HOURS_USAGE,
-                            title=f"Consider off-peak scheduling for {team_name}",
-                            description=(
+                            title=_clip(f"Consider off-peak scheduling for {team_name}", _TITLE_MAX_LENGTH),
+                            description=_clip(
                                 f"Team '{team_name}' ran {len(jobs)} jobs during business hours "
                                 f"(9am-6pm weekdays). Consider scheduling non-urgent training jobs "
                                 f"during off-peak hours (evenings/weekends) to potentially access "
                                 f"discounted pricing or reserved capacity. This could save approximately "
-                                f"${estimated_savings:.2f} through off-peak pricing."
+                                f"${estimated_savings:.2f} through off-peak pricing.",
+                                _DESCRIPTION_MAX_LENGTH
                             ),
                             severity=RecommendationSeverity.LOW,
                             estimated_savings_usd=round(estimated_savings, 2),
-                            evidence=RecommendationEvidence(
-                                date_range={
-                                    "start_date": str(start_date),
-                                    "end_date": str(end_date),
-                                },
+                            evidence=RecommendationEvidence.model_construct(
+                                date_range=date_range,
                                 team_name=team_name,
                                 metadata={
                                     "business_hours_job_count": len(jobs),
@@ -406,77 +519,58 @@ class RecommendationEngine:
         
         return recommendations
     
-    def _determine_severity_by_waste(self, waste_percentage: float) -> RecommendationSeverity:
-        """Determine severity based on waste percentage."""
-        if waste_percentage >= 70:
-            return RecommendationSeverity.HIGH
-        elif waste_percentage >= 50:
-            return RecommendationSeverity.MEDIUM
-        else:
-            return RecommendationSeverity.LOW
-    
-    def _determine_severity_by_runtime(self, runtime_hours: float) -> RecommendationSeverity:
-        """Determine severity based on job runtime."""
-        if runtime_hours >= 72:  # 3+ days
-            return RecommendationSeverity.HIGH
-        elif runtime_hours >= 48:  # 2+ days
-            return RecommendationSeverity.MEDIUM
-        else:
-            return RecommendationSeverity.LOW
+    @staticmethod
+    def _datetime_bounds(start_date: date, end_date: date) -> Tuple[datetime, datetime]:
+        """Convert an inclusive date range to a half-open [start, end) datetime range."""
+        return (
+            datetime.combine(start_date, time.min),
+            datetime.combine(end_date + timedelta(days=1), time.min),
+        )
     
-    def _apply_filters(
-        self, recommendations: List[Recommendation], filters: RecommendationFilters
-    ) -> List[Recommendation]:
-        """Apply post-generation filters to recommendations."""
-        filtered = recommendations
-        
-        # Filter by minimum severity
-        if filters.min_severity:
-            severity_order = {
-                RecommendationSeverity.LOW: 1,
-                RecommendationSeverity.MEDIUM: 2,
-                RecommendationSeverity.HIGH: 3,
-            }
-            min_severity_level = severity_order[filters.min_severity]
-            filtered = [
-                r for r in filtered
-                if severity_order[r.severity] >= min_severity_level
-            ]
-        
-        # Filter by types
-        if filters.types:
-            filtered = [r for r in filtered if r.type in filters.types]
+    def _build_filter(
+        self, filters: RecommendationFilters
+    ) -> Callable[[Recommendation], bool]:
+        """Build a predicate fusing the severity, type and savings filters."""
+        min_severity_level = (
+            _SEVERITY_ORDER[filters.min_severity] if filters.min_severity else None
+        )
+        types = set(filters.types) if filters.types else None
+        min_savings = filters.min_savings
         
-        # Filter by minimum savings
-        if filters.min_savings:
-            filtered = [r for r in filtered if r.estimated_savings_usd >= filters.min_savings]
+        def keep(r: Recommendation) -> bool:
+            return (
+                (min_severity_level is None or _SEVERITY_ORDER[r.severity] >= min_severity_level)
+                and (types is None or r.type in types)
+                and (not min_savings or r.estimated_savings_usd >= min_savings)
+            )
         
-        return filtered
+        return keep
     
-    def _calculate_summary(self, recommendations: List[Recommendation]) -> Dict:
-        """Calculate summary statistics for recommendations."""
-        if not recommendations:
-            return {
-                "total": 0,
-                "by_severity": {},
-                "by_type": {},
-            }
+    def _filter_and_summarize(
+        self, recommendations: List[Recommendation], filters: RecommendationFilters
+    ) -> Tuple[List[Recommendation], Dict, float]:
+        """
+        Filter recommendations and compute their summary in a single pass.
         
-        by_severity = {}
-        by_type = {}
+        Returns:
+            Tuple of (filtered recommendations, summary, total estimated savings)
+        """
+        keep = self._build_filter(filters)
+        filtered: List[Recommendation] = []
+        by_severity: Counter = Counter()
+        by_type: Counter = Counter()
+        total_savings = 0.0
         
         for rec in recommendations:
-            # Count by severity
-            severity_key = rec.severity.value
-            by_severity[severity_key] = by_severity.get(severity_key, 0) + 1
-            
-            # Count by type
-            type_key = rec.type.value
-            by_type[type_key] = by_type.get(type_key, 0) + 1
+            if keep(rec):
+                filtered.append(rec)
+                by_severity[rec.severity.value] += 1
+                by_type[rec.type.value] += 1
+                total_savings += rec.estimated_savings_usd
         
-        return {
-            "total": len(recommendations),
-            "by_severity": by_severity,
-            "by_type": by_type,
+        summary = {
+            "total": len(filtered),
+            "by_severity": dict(by_severity),
+            "by_type": dict(by_type),
         }
-
+        return filtered, summary, total_savings
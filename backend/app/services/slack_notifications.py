@@ -1,17 +1,25 @@
 """Slack notification service for Heliox alerts."""
 import asyncio
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
-from decimal import Decimal
+import random
+from datetime import date, timedelta
+from types import MappingProxyType
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional
 
 import httpx
-from sqlalchemy import select, func
+import orjson
+from sqlalchemy import case, desc, select, func
 from sqlalchemy.orm import Session
 
+from app.core.cache import get_redis
 from app.core.config import get_settings
 from app.models.cost import CostSnapshot
-from app.schemas.recommendation import RecommendationFilters, RecommendationSeverity, RecommendationType
+from app.schemas.recommendation import (
+    Recommendation,
+    RecommendationFilters,
+    RecommendationSeverity,
+    RecommendationType,
+)
 from app.services.recommendations import RecommendationEngine
 
 settings = get_settings()
@@ -20,12 +28,129 @@ logger = logging.getLogger(__name__)
 # Configuration
 SLACK_TIMEOUT = 10  # seconds
 SLACK_MAX_RETRIES = 3
+SLACK_BACKOFF_BASE = 1.0  # seconds; delay before retry n is base * 2**n
+SLACK_BACKOFF_CAP = 30.0  # seconds; upper bound on any single retry delay
+SLACK_BACKOFF_JITTER = 0.5  # fraction of the delay that is randomized
+SLACK_MAX_CONNECTIONS = 8
+SLACK_MAX_BLOCKS = 50  # Slack rejects messages with more blocks than this
+SLACK_MAX_KEEPALIVE_CONNECTIONS = 4
 BURN_RATE_THRESHOLD_USD = 10000  # Daily spend threshold for alerts
+RECOMMENDATIONS_WINDOW_DAYS = 14  # look-back for the high-severity recommendation scan
+SLACK_DEDUP_TTL = 86400  # seconds; an alert for a given day is sent at most once
+SLACK_JSON_HEADERS = {"content-type": "application/json"}
+
+
+def _header_block(text: str) -> Mapping:
+    """Build a read-only header block; used for the static blocks below."""
+    return MappingProxyType({
+        "type": "header",
+        "text": MappingProxyType({
+            "type": "plain_text",
+            "text": text,
+            "emoji": True
+        })
+    })
+
+
+# Invariant Block Kit blocks, built once and shared by every message.
+# Read-only so a caller can't mutate a block that later messages reuse.
+# Stdlib json and httpx's json= reject MappingProxyType, so block lists
+# holding these must be encoded with encode_slack_message.
+_BURN_RATE_HEADER = _header_block("🔥 High Burn Rate Alert")
+_BURN_RATE_CONTEXT = MappingProxyType({
+    "type": "context",
+    "elements": (
+        MappingProxyType({
+            "type": "mrkdwn",
+            "text": "💡 Review your GPU usage to identify cost drivers"
+        }),
+    )
+})
+_IDLE_SPEND_HEADER = _header_block("⚠️ Idle GPU Spend Detected")
+_DAILY_SUMMARY_HEADER = _header_block("📊 Heliox Daily Summary")
+_DIVIDER = MappingProxyType({"type": "divider"})
+_TOP_CONSUMERS_TITLE = MappingProxyType({
+    "type": "section",
+    "text": MappingProxyType({
+        "type": "mrkdwn",
+        "text": "*Top GPU Consumers (Yesterday):*"
+    })
+})
+
+
+def _claim_send(key: str) -> bool:
+    """
+    Claim the idempotency key for an alert; False if it was already sent.
+    
+    Fails open: without Redis the alert is sent, as before.
+    """
+    redis_client = get_redis()
+    if not redis_client:
+        return True
+    
+    try:
+        return bool(redis_client.set(key, "1", nx=True, ex=SLACK_DEDUP_TTL))
+    except Exception as e:
+        logger.warning(f"Redis dedup claim error: {e}")
+        return True
+
+
+def _release_send(key: str) -> None:
+    """Release an idempotency key after a failed send so a retry can resend."""
+    redis_client = get_redis()
+    if not redis_client:
+        return
+    
+    try:
+        redis_client.delete(key)
+    except Exception as e:
+        logger.warning(f"Redis dedup release error: {e}")
+
+
+def _json_default(obj):
+    """Serialize the read-only static blocks, which orjson doesn't handle natively."""
+    if isinstance(obj, MappingProxyType):
+        return dict(obj)
+    raise TypeError
+
+
+def encode_slack_message(blocks: List[Mapping[str, Any]], text: str) -> bytes:
+    """
+    Encode a Block Kit message into the JSON body posted to the webhook.
+    
+    The only supported encoder for block lists from the _create_*_blocks
+    builders, which may hold the read-only shared blocks.
+    """
+    return orjson.dumps({"text": text, "blocks": blocks}, default=_json_default)
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Capped exponential backoff with jitter so workers don't retry in lockstep."""
+    delay = min(SLACK_BACKOFF_CAP, SLACK_BACKOFF_BASE * 2 ** attempt)
+    return delay * (1 - SLACK_BACKOFF_JITTER + random.random() * SLACK_BACKOFF_JITTER)
+
+
+def _is_retryable_status(status_code: int) -> bool:
+    """Timeouts, rate limiting and server errors are transient; other 4xx will not recover."""
+    return status_code in (408, 429) or status_code >= 500
+
+
+def _retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Parse a Retry-After header given in seconds, capped at SLACK_BACKOFF_CAP."""
+    try:
+        retry_after = float(response.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+    return min(max(retry_after, 0.0), SLACK_BACKOFF_CAP)
 
 
 class SlackNotificationService:
     """Service for sending Slack notifications."""
     
+    # Shared across instances so webhook posts reuse pooled keep-alive
+    # connections instead of paying a TCP+TLS handshake per message
+    _client: Optional[httpx.AsyncClient] = None
+    
     def __init__(self, webhook_url: Optional[str] = None):
         """
         Initialize Slack notification service.
@@ -39,6 +164,32 @@ class SlackNotificationService:
         if not self.enabled:
             logger.warning("Slack notifications disabled: SLACK_WEBHOOK_URL not configured")
     
+    @classmethod
+    async def get_client(cls) -> httpx.AsyncClient:
+        """Return the shared HTTP client, creating it on first use."""
+        if cls._client is None or cls._client.is_closed:
+            cls._client = httpx.AsyncClient(
+                timeout=SLACK_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=SLACK_MAX_CONNECTIONS,
+                    max_keepalive_connections=SLACK_MAX_KEEPALIVE_CONNECTIONS,
+                ),
+            )
+        return cls._client
+    
+    @classmethod
+    async def close_client(cls) -> None:
+        """
+        Close the shared HTTP client.
+        
+        The client is bound to the event loop it was first used on, so callers
+        that run each job in a fresh loop (e.g. Celery tasks) must close it
+        before that loop ends.
+        """
+        if cls._client is not None:
+            await cls._client.aclose()
+            cls._client = None
+    
     def _mask_webhook_url(self, url: str) -> str:
         """Mask webhook URL for safe logging."""
         if not url:
@@ -46,13 +197,22 @@ class SlackNotificationService:
         # Show only last 8 characters
         return f"***{url[-8:]}"
     
-    async def _send_slack_message(self, blocks: List[Dict], text: str) -> bool:
+    async def _send_slack_message(
+        self,
+        blocks: List[Mapping[str, Any]],
+        text: str,
+        *,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+        client: Optional[httpx.AsyncClient] = None
+    ) -> bool:
         """
         Send a message to Slack using webhook.
         
         Args:
             blocks: Slack Block Kit blocks
             text: Fallback text for notifications
+            sleep: Coroutine used to wait between retries
+            client: HTTP client to post with (defaults to the shared client)
             
         Returns:
             True if successful, False otherwise
@@ -61,48 +221,119 @@ class SlackNotificationService:
             logger.info("Slack notification skipped (not configured)")
             return False
         
-        payload = {
-            "text": text,
-            "blocks": blocks
-        }
-        
-        async with httpx.AsyncClient(timeout=SLACK_TIMEOUT) as client:
-            for attempt in range(1, SLACK_MAX_RETRIES + 1):
-                try:
-                    response = await client.post(
-                        self.webhook_url,
-                        json=payload
+        # Encode once up front; retries resend the same bytes
+        return await self.send_raw(
+            encode_slack_message(blocks, text), sleep=sleep, client=client
+        )
+    
+    async def send_combined(self, sections: List[List[Mapping[str, Any]]], text: str) -> bool:
+        """
+        Send several block sections as one message, separated by dividers.
+        
+        One POST instead of one per section.
+        
+        Args:
+            sections: Block lists, e.g. from the _create_*_blocks builders
+            text: Fallback text for notifications
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        blocks = []
+        for i, section in enumerate(sections):
+            if i:
+                blocks.append(_DIVIDER)
+            blocks.extend(section)
+        
+        if len(blocks) > SLACK_MAX_BLOCKS:
+            logger.error(
+                f"Combined Slack message has {len(blocks)} blocks "
+                f"(limit {SLACK_MAX_BLOCKS}); not sent"
+            )
+            return False
+        
+        return await self._send_slack_message(blocks, text)
+    
+    async def send_raw(
+        self,
+        body: bytes,
+        *,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+        client: Optional[httpx.AsyncClient] = None
+    ) -> bool:
+        """
+        Post a pre-encoded JSON message body to the webhook, with retries.
+        
+        Lets callers that send a fixed message build and encode it once
+        (see encode_slack_message) instead of on every send.
+        
+        Args:
+            body: JSON-encoded Slack message
+            sleep: Coroutine used to wait between retries
+            client: HTTP client to post with (defaults to the shared client)
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        if not self.enabled:
+            logger.info("Slack notification skipped (not configured)")
+            return False
+        
+        if client is None:
+            client = await self.get_client()
+        
+        for attempt in range(1, SLACK_MAX_RETRIES + 1):
+            retry_after = None
+            
+            try:
+                response = await client.post(
+                    self.webhook_url,
+                    content=body,
+                    headers=SLACK_JSON_HEADERS
+                )
+                
+                if 200 <= response.status_code < 300:
+                    logger.info(
+                        f"Slack notification sent successfully "
+                        f"(webhook: {self._mask_webhook_url(self.webhook_url)})"
                     )
-                    
-                    if response.status_code == 200:
-                        logger.info(
-                            f"Slack notification sent successfully "
-                            f"(webhook: {self._mask_webhook_url(self.webhook_url)})"
-                        )
-                        return True
-                    else:
-                        logger.warning(
-                            f"External service failure: Slack notification failed (attempt {attempt}/{SLACK_MAX_RETRIES}): "
-                            f"status={response.status_code}",
-                            extra={"service": "slack", "status_code": response.status_code, "attempt": attempt}
-                        )
-                        
-                except httpx.TimeoutException:
+                    return True
+                elif _is_retryable_status(response.status_code):
+                    if response.status_code == 429:
+                        retry_after = _retry_after_seconds(response)
                     logger.warning(
-                        f"External service failure: Slack notification timeout (attempt {attempt}/{SLACK_MAX_RETRIES})",
-                        extra={"service": "slack", "error_type": "timeout", "attempt": attempt},
-                        exc_info=True
+                        f"External service failure: Slack notification failed (attempt {attempt}/{SLACK_MAX_RETRIES}): "
+                        f"status={response.status_code}",
+                        extra={"service": "slack", "status_code": response.status_code, "attempt": attempt}
                     )
-                except Exception as e:
-                    logger.warning(
-                        f"External service failure: Slack notification error (attempt {attempt}/{SLACK_MAX_RETRIES}): {type(e).__name__}",
-                        exc_info=True,
-                        extra={"service": "slack", "error_type": type(e).__name__, "attempt": attempt}
+                else:
+                    # Bad or revoked webhook: retrying cannot succeed
+                    logger.error(
+                        f"External service failure: Slack notification rejected: "
+                        f"status={response.status_code}",
+                        extra={"service": "slack", "status_code": response.status_code, "attempt": attempt}
                     )
-                
-                # Wait before retry (exponential backoff)
-                if attempt < SLACK_MAX_RETRIES:
-                    await asyncio.sleep(2 ** attempt)
+                    return False
+                    
+            except httpx.TimeoutException:
+                logger.warning(
+                    f"External service failure: Slack notification timeout (attempt {attempt}/{SLACK_MAX_RETRIES})",
+                    extra={"service": "slack", "error_type": "timeout", "attempt": attempt},
+                    exc_info=True
+                )
+            except Exception as e:
+                logger.warning(
+                    f"External service failure: Slack notification error (attempt {attempt}/{SLACK_MAX_RETRIES}): {type(e).__name__}",
+                    exc_info=True,
+                    extra={"service": "slack", "error_type": type(e).__name__, "attempt": attempt}
+                )
+            
+            # Wait before retry: Slack's Retry-After when rate limited,
+            # otherwise capped exponential backoff with jitter
+            if attempt < SLACK_MAX_RETRIES:
+                await sleep(
+                    retry_after if retry_after is not None else _backoff_delay(attempt)
+                )
         
         logger.warning(
             "External service failure: Slack notification failed after all retries",
@@ -110,6 +341,22 @@ class SlackNotificationService:
         )
         return False
     
+    async def _send_once(self, key: str, blocks: List[Mapping[str, Any]], text: str) -> bool:
+        """
+        Send a message unless one with the same idempotency key already went out.
+        
+        Celery retries and repeated beat ticks re-run the checks, so without
+        this the same alert would be posted to Slack more than once.
+        """
+        if not _claim_send(key):
+            logger.info(f"Slack alert already sent, skipping: {key}")
+            return True
+        
+        sent = await self._send_slack_message(blocks, text)
+        if not sent:
+            _release_send(key)
+        return sent
+    
     def _format_currency(self, amount: float) -> str:
         """Format currency for display."""
         return f"${amount:,.2f}"
@@ -119,19 +366,12 @@ class SlackNotificationService:
         daily_cost: float,
         threshold: float,
         date: str
-    ) -> List[Dict]:
+    ) -> List[Mapping[str, Any]]:
         """Create Slack blocks for burn rate alert."""
         percentage_over = ((daily_cost - threshold) / threshold) * 100
         
         return [
-            {
-                "type": "header",
-                "text": {
-                    "type": "plain_text",
-                    "text": "🔥 High Burn Rate Alert",
-                    "emoji": True
-                }
-            },
+            _BURN_RATE_HEADER,
             {
                 "type": "section",
                 "text": {
@@ -146,21 +386,13 @@ class SlackNotificationService:
                     )
                 }
             },
-            {
-                "type": "context",
-                "elements": [
-                    {
-                        "type": "mrkdwn",
-                        "text": "💡 Review your GPU usage to identify cost drivers"
-                    }
-                ]
-            }
+            _BURN_RATE_CONTEXT
         ]
     
     def _create_idle_spend_alert_blocks(
         self,
         recommendations: List[Dict]
-    ) -> List[Dict]:
+    ) -> List[Mapping[str, Any]]:
         """Create Slack blocks for idle spend alert."""
         total_idle_savings = sum(
             rec.get("estimated_savings_usd", 0)
@@ -168,14 +400,7 @@ class SlackNotificationService:
         )
         
         blocks = [
-            {
-                "type": "header",
-                "text": {
-                    "type": "plain_text",
-                    "text": "⚠️ Idle GPU Spend Detected",
-                    "emoji": True
-                }
-            },
+            _IDLE_SPEND_HEADER,
             {
                 "type": "section",
                 "text": {
@@ -187,9 +412,7 @@ class SlackNotificationService:
                     )
                 }
             },
-            {
-                "type": "divider"
-            }
+            _DIVIDER
         ]
         
         # Add individual recommendations
@@ -227,17 +450,10 @@ class SlackNotificationService:
         top_models: List[Dict],
         high_severity_count: int,
         total_savings: float
-    ) -> List[Dict]:
+    ) -> List[Mapping[str, Any]]:
         """Create Slack blocks for daily summary."""
         blocks = [
-            {
-                "type": "header",
-                "text": {
-                    "type": "plain_text",
-                    "text": "📊 Heliox Daily Summary",
-                    "emoji": True
-                }
-            },
+            _DAILY_SUMMARY_HEADER,
             {
                 "type": "section",
                 "fields": [
@@ -263,14 +479,8 @@ class SlackNotificationService:
         
         # Top models
         if top_models:
-            blocks.append({"type": "divider"})
-            blocks.append({
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": "*Top GPU Consumers (Yesterday):*"
-                }
-            })
+            blocks.append(_DIVIDER)
+            blocks.append(_TOP_CONSUMERS_TITLE)
             
             for model in top_models[:3]:
                 blocks.append({
@@ -283,7 +493,7 @@ class SlackNotificationService:
         
         # Recommendations summary
         if high_severity_count > 0:
-            blocks.append({"type": "divider"})
+            blocks.append(_DIVIDER)
             blocks.append({
                 "type": "section",
                 "text": {
@@ -314,6 +524,10 @@ class SlackNotificationService:
         Returns:
             True if sent successfully
         """
+        if not self.enabled:
+            logger.debug("Slack disabled, skipping burn rate alert")
+            return False
+        
         logger.info(
             f"Sending burn rate alert: daily_cost=${daily_cost:.2f}, "
             f"threshold=${threshold:.2f}, date={date}"
@@ -322,7 +536,7 @@ class SlackNotificationService:
         blocks = self._create_burn_rate_alert_blocks(daily_cost, threshold, date)
         text = f"High Burn Rate Alert: ${daily_cost:.2f} spent on {date}"
         
-        return await self._send_slack_message(blocks, text)
+        return await self._send_once(f"slack:burn:{date}", blocks, text)
     
     async def send_idle_spend_alert(
         self,
@@ -337,12 +551,16 @@ class SlackNotificationService:
         Returns:
             True if sent successfully
         """
+        if not self.enabled:
+            logger.debug("Slack disabled, skipping idle spend alert")
+            return False
+        
         logger.info(f"Sending idle spend alert: {len(recommendations)} recommendations")
         
         blocks = self._create_idle_spend_alert_blocks(recommendations)
         text = f"Idle GPU Spend Alert: {len(recommendations)} high-severity issues found"
         
-        return await self._send_slack_message(blocks, text)
+        return await self._send_once(f"slack:idle:{date.today().isoformat()}", blocks, text)
     
     async def send_daily_summary(
         self,
@@ -367,6 +585,10 @@ class SlackNotificationService:
         Returns:
             True if sent successfully
         """
+        if not self.enabled:
+            logger.debug("Slack disabled, skipping daily summary")
+            return False
+        
         logger.info("Sending daily summary")
         
         blocks = self._create_daily_summary_blocks(
@@ -378,8 +600,40 @@ class SlackNotificationService:
             total_savings
         )
         text = f"Heliox Daily Summary: ${daily_cost:.2f} spent yesterday"
+        yesterday = date.today() - timedelta(days=1)
         
-        return await self._send_slack_message(blocks, text)
+        return await self._send_once(f"slack:summary:{yesterday.isoformat()}", blocks, text)
+
+
+def scan_high_severity_recommendations(
+    db: Session,
+    end_date: Optional[date] = None,
+    types: Optional[List[RecommendationType]] = None
+) -> List[Recommendation]:
+    """
+    Run the high-severity recommendation scan shared by the Slack checks.
+    
+    By default covers the RECOMMENDATIONS_WINDOW_DAYS ending yesterday,
+    across all recommendation types, so one result can feed both the idle
+    spend alert and the daily summary.
+    
+    Args:
+        db: Database session
+        end_date: Last day of the window. Defaults to yesterday.
+        types: Recommendation types to run. Defaults to all.
+        
+    Returns:
+        High-severity recommendations
+    """
+    if end_date is None:
+        end_date = date.today() - timedelta(days=1)
+    filters = RecommendationFilters(
+        start_date=end_date - timedelta(days=RECOMMENDATIONS_WINDOW_DAYS),
+        end_date=end_date,
+        min_severity=RecommendationSeverity.HIGH,
+        types=types
+    )
+    return RecommendationEngine(db).generate_recommendations(filters).recommendations
 
 
 async def check_and_send_burn_rate_alert(db: Session, date_str: Optional[str] = None) -> bool:
@@ -393,16 +647,21 @@ async def check_and_send_burn_rate_alert(db: Session, date_str: Optional[str] =
     Returns:
         True if alert was sent
     """
-    from datetime import date, timedelta
+    # Nothing could be sent, so skip the DB queries entirely
+    if not settings.SLACK_WEBHOOK_URL:
+        logger.debug("Slack disabled, skipping burn rate check")
+        return False
     
-    # Default to yesterday
+    # Default to yesterday; compare against a date so the date index is usable
     if date_str is None:
         check_date = date.today() - timedelta(days=1)
         date_str = check_date.strftime("%Y-%m-%d")
+    else:
+        check_date = date.fromisoformat(date_str)
     
     # Get daily cost
     query = select(func.sum(CostSnapshot.cost_usd)).where(
-        CostSnapshot.date == date_str
+        CostSnapshot.date == check_date
     )
     result = db.execute(query).scalar_one_or_none()
     daily_cost = float(result) if result else 0.0
@@ -422,35 +681,38 @@ async def check_and_send_burn_rate_alert(db: Session, date_str: Optional[str] =
     return False
 
 
-async def check_and_send_idle_spend_alert(db: Session) -> bool:
+async def check_and_send_idle_spend_alert(
+    db: Session,
+    recommendations: Optional[List[Recommendation]] = None
+) -> bool:
     """
     Check for high-severity idle spend recommendations and send alert.
     
     Args:
         db: Database session
+        recommendations: Result of scan_high_severity_recommendations, when
+            the caller already ran it (window ends yesterday). Otherwise
+            only the idle GPU detector is run, over a window ending today.
         
     Returns:
         True if alert was sent
     """
-    from datetime import date, timedelta
-    
-    # Get recommendations for last 14 days
-    end_date = date.today()
-    start_date = end_date - timedelta(days=14)
-    
-    # Create filters for high-severity idle GPU recommendations
-    filters = RecommendationFilters(
-        start_date=start_date,
-        end_date=end_date,
-        min_severity=RecommendationSeverity.HIGH,
-        types=[RecommendationType.IDLE_GPU]
-    )
+    if not settings.SLACK_WEBHOOK_URL:
+        logger.debug("Slack disabled, skipping idle spend check")
+        return False
     
-    rec_engine = RecommendationEngine(db)
-    response = rec_engine.generate_recommendations(filters)
+    if recommendations is None:
+        recommendations = scan_high_severity_recommendations(
+            db,
+            end_date=date.today(),
+            types=[RecommendationType.IDLE_GPU]
+        )
     
-    # Convert Recommendation objects to dicts
-    idle_recommendations = [rec.model_dump() for rec in response.recommendations]
+    # Keep only idle GPU recommendations, as dicts for the block builder
+    idle_recommendations = [
+        rec.model_dump() for rec in recommendations
+        if rec.type == RecommendationType.IDLE_GPU
+    ]
     
     logger.info(f"Found {len(idle_recommendations)} high-severity idle spend recommendations")
     
@@ -462,39 +724,47 @@ async def check_and_send_idle_spend_alert(db: Session) -> bool:
     return False
 
 
-async def send_daily_summary_report(db: Session) -> bool:
+async def send_daily_summary_report(
+    db: Session,
+    recommendations: Optional[List[Recommendation]] = None
+) -> bool:
     """
     Generate and send daily summary report.
     
     Args:
         db: Database session
+        recommendations: Result of scan_high_severity_recommendations, when
+            the caller already ran it. Scanned here otherwise.
         
     Returns:
         True if sent successfully
     """
-    from datetime import date, timedelta
-    from sqlalchemy import desc
+    if not settings.SLACK_WEBHOOK_URL:
+        logger.debug("Slack disabled, skipping daily summary report")
+        return False
     
     today = date.today()
     yesterday = today - timedelta(days=1)
     week_ago = today - timedelta(days=7)
     month_ago = today - timedelta(days=30)
     
-    # Get cost summaries
-    yesterday_query = select(func.sum(CostSnapshot.cost_usd)).where(
-        CostSnapshot.date == yesterday
-    )
-    daily_cost = float(db.execute(yesterday_query).scalar_one_or_none() or 0)
-    
-    weekly_query = select(func.sum(CostSnapshot.cost_usd)).where(
-        CostSnapshot.date >= week_ago
-    )
-    weekly_cost = float(db.execute(weekly_query).scalar_one_or_none() or 0)
-    
-    monthly_query = select(func.sum(CostSnapshot.cost_usd)).where(
+    # Get cost summaries: yesterday / 7-day / 30-day totals in one round trip
+    # via conditional aggregation over the 30-day window
+    summary_query = select(
+        func.sum(
+            case((CostSnapshot.date == yesterday, CostSnapshot.cost_usd), else_=0)
+        ).label("daily"),
+        func.sum(
+            case((CostSnapshot.date >= week_ago, CostSnapshot.cost_usd), else_=0)
+        ).label("weekly"),
+        func.sum(CostSnapshot.cost_usd).label("monthly"),
+    ).where(
         CostSnapshot.date >= month_ago
     )
-    monthly_cost = float(db.execute(monthly_query).scalar_one_or_none() or 0)
+    summary_row = db.execute(summary_query).mappings().one()
+    daily_cost = float(summary_row["daily"] or 0)
+    weekly_cost = float(summary_row["weekly"] or 0)
+    monthly_cost = float(summary_row["monthly"] or 0)
     
     # Get top GPU types from yesterday (simplified: no model attribution)
     top_gpu_query = select(
@@ -510,23 +780,18 @@ async def send_daily_summary_report(db: Session) -> bool:
         desc("cost")
     ).limit(3)
     
-    top_gpu_result = db.execute(top_gpu_query).all()
+    top_gpu_rows = db.execute(top_gpu_query).mappings().all()
     top_models = [
-        {"model_name": f"{row.gpu_type.upper()} ({row.provider.upper()})", "cost": float(row.cost)}
-        for row in top_gpu_result
+        {"model_name": f"{row['gpu_type'].upper()} ({row['provider'].upper()})", "cost": float(row["cost"])}
+        for row in top_gpu_rows
     ]
     
     # Get recommendations
-    filters = RecommendationFilters(
-        start_date=yesterday - timedelta(days=14),
-        end_date=yesterday,
-        min_severity=RecommendationSeverity.HIGH
-    )
-    rec_engine = RecommendationEngine(db)
-    response = rec_engine.generate_recommendations(filters)
+    if recommendations is None:
+        recommendations = scan_high_severity_recommendations(db)
     
-    high_severity_count = len(response.recommendations)
-    total_savings = sum(rec.estimated_savings_usd for rec in response.recommendations)
+    high_severity_count = len(recommendations)
+    total_savings = sum(rec.estimated_savings_usd for rec in recommendations)
     
     # Send summary
     slack_service = SlackNotificationService()
@@ -4,16 +4,39 @@ import logging
 from typing import Optional
 
 from app.celery_app import celery_app
+from app.core.config import get_settings
 from app.core.db import SessionLocal
 from app.services.slack_notifications import (
+    SlackNotificationService,
     check_and_send_burn_rate_alert,
     check_and_send_idle_spend_alert,
+    scan_high_severity_recommendations,
     send_daily_summary_report
 )
 
+settings = get_settings()
 logger = logging.getLogger(__name__)
 
 
+async def _with_slack_client(coro):
+    """Await a Slack coroutine, then close the shared HTTP client on this loop."""
+    try:
+        return await coro
+    finally:
+        await SlackNotificationService.close_client()
+
+
+def _run_async(coro):
+    """
+    Run a Slack coroutine to completion from a synchronous Celery task.
+    
+    asyncio.run gives each task a fresh event loop and fully finalizes it
+    (pending tasks cancelled, async generators closed), so loops are not
+    leaked across tasks in long-lived worker processes.
+    """
+    return asyncio.run(_with_slack_client(coro))
+
+
 @celery_app.task(
     name="app.tasks.slack_tasks.check_burn_rate_task",
     bind=True,
@@ -31,16 +54,7 @@ def check_burn_rate_task(self, date_str: Optional[str] = None):
     
     db = SessionLocal()
     try:
-        # Run async function in sync context
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
-            # If loop is running, create new one
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-        
-        alert_sent = loop.run_until_complete(
-            check_and_send_burn_rate_alert(db, date_str)
-        )
+        alert_sent = _run_async(check_and_send_burn_rate_alert(db, date_str))
         
         if alert_sent:
             logger.info("Burn rate alert sent successfully")
@@ -71,15 +85,7 @@ def check_idle_spend_task(self):
     
     db = SessionLocal()
     try:
-        # Run async function in sync context
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-        
-        alert_sent = loop.run_until_complete(
-            check_and_send_idle_spend_alert(db)
-        )
+        alert_sent = _run_async(check_and_send_idle_spend_alert(db))
         
         if alert_sent:
             logger.info("Idle spend alert sent successfully")
@@ -110,15 +116,7 @@ def send_daily_summary_task(self):
     
     db = SessionLocal()
     try:
-        # Run async function in sync context
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-        
-        sent = loop.run_until_complete(
-            send_daily_summary_report(db)
-        )
+        sent = _run_async(send_daily_summary_report(db))
         
         if sent:
             logger.info("Daily summary sent successfully")
@@ -134,3 +132,66 @@ def send_daily_summary_task(self):
     finally:
         db.close()
 
+
+async def _run_daily_checks(db) -> list:
+    """
+    Run the burn rate, idle spend and daily summary checks concurrently.
+    
+    The checks are independent, so their Slack round trips overlap and the
+    batch takes about as long as the slowest check. Exceptions are returned
+    in place of results so one failing check doesn't cancel the others.
+    
+    The high-severity recommendation scan is run once and shared by the
+    idle spend alert and the daily summary.
+    """
+    recommendations = None
+    if settings.SLACK_WEBHOOK_URL:
+        recommendations = scan_high_severity_recommendations(db)
+    
+    return await asyncio.gather(
+        check_and_send_burn_rate_alert(db),
+        check_and_send_idle_spend_alert(db, recommendations),
+        send_daily_summary_report(db, recommendations),
+        return_exceptions=True
+    )
+
+
+@celery_app.task(
+    name="app.tasks.slack_tasks.run_daily_slack_checks",
+    bind=True,
+    max_retries=3,
+    default_retry_delay=300  # 5 minutes
+)
+def run_daily_slack_checks(self):
+    """
+    Celery task to run all daily Slack checks in one event loop.
+    
+    Shares one DB session and one HTTP client across the three checks.
+    If any check fails, the whole batch is retried. Messages that already
+    went out are not resent, because each send claims a Redis
+    idempotency key first.
+    """
+    logger.info("Starting daily Slack checks")
+    
+    db = SessionLocal()
+    try:
+        results = _run_async(_run_daily_checks(db))
+    finally:
+        db.close()
+    
+    summary = {}
+    for name, result in zip(("burn_rate", "idle_spend", "daily_summary"), results):
+        if isinstance(result, Exception):
+            logger.error(f"Daily Slack check '{name}' failed: {result}", exc_info=result)
+            summary[name] = {"sent": False, "error": type(result).__name__}
+        else:
+            summary[name] = {"sent": result}
+    
+    logger.info(f"Daily Slack checks complete: {summary}")
+    
+    failed = [name for name, result in summary.items() if "error" in result]
+    if failed and self.request.retries < self.max_retries:
+        # Checks that succeeded are skipped on retry by their dedup keys
+        raise self.retry()
+    
+    return summary
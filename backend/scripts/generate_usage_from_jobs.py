@@ -7,7 +7,8 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from datetime import date, timedelta
 from decimal import Decimal
-from sqlalchemy import create_engine, select, func
+from sqlalchemy import and_, create_engine, func, select, text
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
 from app.core.config import get_settings
@@ -16,6 +17,46 @@ from app.models.job import Job
 
 settings = get_settings()
 
+STREAM_CHUNK_SIZE = 1000  # Aggregated rows fetched (and upserted) per partition
+COMMIT_EVERY_PARTITIONS = 10  # Commit after this many partitions to bound transaction size
+
+
+def _upsert_usage_rows(db: Session, results) -> int:
+    """
+    Upsert a chunk of aggregated usage rows with one INSERT ... ON CONFLICT.
+    
+    Args:
+        db: Database session
+        results: (date, provider, gpu_type, total_hours) rows
+    
+    Returns:
+        Number of rows upserted
+    """
+    rows = [
+        {
+            "date": day,
+            "provider": provider,
+            "gpu_type": gpu_type,
+            "gpu_hours": Decimal(str(round(total_hours, 2))),
+        }
+        for day, provider, gpu_type, total_hours in results
+        if total_hours and total_hours > 0
+    ]
+    
+    if not rows:
+        return 0
+    
+    upsert = insert(UsageSnapshot).values(rows)
+    upsert = upsert.on_conflict_do_update(
+        index_elements=["date", "provider", "gpu_type"],
+        # onupdate hooks don't fire for ON CONFLICT, so bump updated_at here
+        set_={"gpu_hours": upsert.excluded.gpu_hours, "updated_at": func.now()},
+    )
+    db.execute(upsert)
+    for row in rows:
+        print(f"  Upserted: {row['date']} {row['provider']} {row['gpu_type']}: {row['gpu_hours']} hours")
+    return len(rows)
+
 
 def generate_usage_snapshots(db: Session, start_date: date, end_date: date):
     """
@@ -24,7 +65,10 @@ def generate_usage_snapshots(db: Session, start_date: date, end_date: date):
     For each day and (provider, gpu_type) combination:
     1. Find all jobs that ran on that day
     2. Calculate total GPU hours used
-    3. Create/update UsageSnapshot record
+    
+    The days are generated server-side with generate_series, so the whole
+    window is aggregated in one query. Rows are streamed from a server-side
+    cursor and upserted chunk by chunk with INSERT ... ON CONFLICT.
     
     Args:
         db: Database session
@@ -33,65 +77,56 @@ def generate_usage_snapshots(db: Session, start_date: date, end_date: date):
     """
     print(f"Generating usage snapshots from {start_date} to {end_date}")
     
-    current_date = start_date
-    total_created = 0
+    # One row per day in the window, generated server-side
+    days = select(
+        func.generate_series(start_date, end_date, text("interval '1 day'")).label('d')
+    ).subquery()
     
-    while current_date <= end_date:
-        # Get all jobs that were running on this date
-        stmt = (
-            select(
-                Job.provider,
-                Job.gpu_type,
-                func.sum(
-                    func.extract(
-                        'epoch',
-                        func.least(Job.end_time, current_date + timedelta(days=1)) -
-                        func.greatest(Job.start_time, current_date)
-                    ) / 3600
-                ).label('total_hours')
-            )
-            .where(
-                Job.start_time.isnot(None),
-                Job.end_time.isnot(None),
-                func.date(Job.start_time) <= current_date,
-                func.date(Job.end_time) >= current_date
+    # Aggregate every day's per-(provider, gpu_type) hours in a single query
+    stmt = (
+        select(
+            func.date(days.c.d).label('date'),
+            func.lower(Job.provider).label('provider'),
+            func.lower(Job.gpu_type).label('gpu_type'),
+            func.sum(
+                func.extract(
+                    'epoch',
+                    func.least(Job.end_time, days.c.d + timedelta(days=1)) -
+                    func.greatest(Job.start_time, days.c.d)
+                ) / 3600
+            ).label('total_hours')
+        )
+        .join(
+            Job,
+            and_(
+                func.date(Job.start_time) <= func.date(days.c.d),
+                func.date(Job.end_time) >= func.date(days.c.d),
             )
-            .group_by(Job.provider, Job.gpu_type)
         )
-        
-        results = db.execute(stmt).all()
-        
-        for provider, gpu_type, total_hours in results:
-            if total_hours and total_hours > 0:
-                # Check if usage snapshot already exists
-                existing = db.execute(
-                    select(UsageSnapshot).where(
-                        UsageSnapshot.date == current_date,
-                        UsageSnapshot.provider == provider.lower(),
-                        UsageSnapshot.gpu_type == gpu_type.lower()
-                    )
-                ).scalar_one_or_none()
-                
-                if existing:
-                    # Update existing
-                    existing.gpu_hours = Decimal(str(round(total_hours, 2)))
-                    print(f"  Updated: {current_date} {provider} {gpu_type}: {total_hours:.2f} hours")
-                else:
-                    # Create new
-                    usage = UsageSnapshot(
-                        date=current_date,
-                        provider=provider.lower(),
-                        gpu_type=gpu_type.lower(),
-                        gpu_hours=Decimal(str(round(total_hours, 2)))
-                    )
-                    db.add(usage)
-                    total_created += 1
-                    print(f"  Created: {current_date} {provider} {gpu_type}: {total_hours:.2f} hours")
-        
-        current_date += timedelta(days=1)
+        .where(
+            Job.start_time.isnot(None),
+            Job.end_time.isnot(None),
+        )
+        # Group on the normalized key so each upsert row targets a distinct snapshot
+        .group_by(days.c.d, func.lower(Job.provider), func.lower(Job.gpu_type))
+        .order_by(days.c.d)
+    )
+    
+    total_upserted = 0
+    
+    # Stream on a dedicated connection: committing the session's transaction
+    # would close the server-side cursor mid-iteration
+    with db.get_bind().connect() as read_conn:
+        results = read_conn.execute(
+            stmt.execution_options(stream_results=True, yield_per=STREAM_CHUNK_SIZE)
+        )
+        for i, chunk in enumerate(results.partitions(), start=1):
+            total_upserted += _upsert_usage_rows(db, chunk)
+            if i % COMMIT_EVERY_PARTITIONS == 0:
+                db.commit()
     
     db.commit()
-    print(f"\nTotal usage snapshots created: {total_created}")
+    print(f"\nTotal usage snapshots created or updated: {total_upserted}")
     
     # Show summary
     total_usage = db.execute(
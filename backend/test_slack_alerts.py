@@ -1,27 +1,135 @@
 """Test script for Slack alerts - sends sample messages to verify formatting."""
+import argparse
 import asyncio
+import os
 import sys
-from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, List, Mapping, NamedTuple
+from urllib.parse import urlsplit
 
-# Add parent directory to path
-sys.path.insert(0, '/Users/sarish/Downloads/Projects/Heliox-AI/backend')
+import pytest
+import pytest_asyncio
 
-from app.services.slack_notifications import SlackNotificationService
+# Make the backend's app package importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent))
 
+from app.services.slack_notifications import SlackNotificationService, encode_slack_message
 
-async def test_burn_rate_alert(webhook_url: str):
-    """Test burn rate alert formatting."""
-    print("\n" + "="*80)
-    print("Testing: 🔥 High Burn Rate Alert")
-    print("="*80)
-    
-    service = SlackNotificationService(webhook_url=webhook_url)
+# Sends real messages to a live webhook: keep out of parallel (xdist) runs,
+# and only run under pytest when a webhook is configured
+pytestmark = [
+    pytest.mark.serial,
+    pytest.mark.skipif(
+        not os.getenv("SLACK_WEBHOOK_URL"),
+        reason="SLACK_WEBHOOK_URL not set"
+    ),
+]
+
+# Sample alert data; rendered and encoded once per service by render_payloads
+RECOMMENDATIONS = (
+    {
+        "title": "Idle GPU: H100 on AWS us-west-2",
+        "description": "H100 GPU has been 100% idle for 14 days. This represents wasted compute capacity and ongoing costs.",
+        "estimated_savings_usd": 1176.00,
+        "severity": "high"
+    },
+    {
+        "title": "Idle GPU: A100 on GCP us-central1",
+        "description": "A100 GPU showing 100% idle time over the past 7 days with zero job executions.",
+        "estimated_savings_usd": 1200.00,
+        "severity": "high"
+    }
+)
+
+TOP_MODELS = (
+    {"model_name": "Stable Diffusion XL", "cost": 5123.45},
+    {"model_name": "GPT-4", "cost": 3456.78},
+    {"model_name": "BERT-Large", "cost": 1234.56}
+)
+
+
+class SamplePayloads(NamedTuple):
+    """Rendered blocks and pre-encoded message bodies for the sample alerts."""
+    burn_rate_blocks: List[Mapping[str, Any]]
+    idle_spend_blocks: List[Mapping[str, Any]]
+    summary_blocks: List[Mapping[str, Any]]
+    burn_rate_body: bytes
+    idle_spend_body: bytes
+    summary_body: bytes
+
+
+def render_payloads(service: SlackNotificationService) -> SamplePayloads:
+    """
+    Render the sample alerts with the service's block builders.
     
-    success = await service.send_burn_rate_alert(
+    The payloads are fixed, so they are rendered and encoded once per run;
+    each send then only posts the pre-encoded bytes.
+    """
+    burn_rate_blocks = service._create_burn_rate_alert_blocks(
         daily_cost=15234.56,
         threshold=10000.00,
         date="2026-01-09"
     )
+    idle_spend_blocks = service._create_idle_spend_alert_blocks(list(RECOMMENDATIONS))
+    summary_blocks = service._create_daily_summary_blocks(
+        daily_cost=11234.56,
+        weekly_cost=78456.78,
+        monthly_cost=324567.89,
+        top_models=list(TOP_MODELS),
+        high_severity_count=2,
+        total_savings=2376.00
+    )
+    
+    return SamplePayloads(
+        burn_rate_blocks=burn_rate_blocks,
+        idle_spend_blocks=idle_spend_blocks,
+        summary_blocks=summary_blocks,
+        burn_rate_body=encode_slack_message(
+            burn_rate_blocks,
+            "High Burn Rate Alert: $15234.56 spent on 2026-01-09"
+        ),
+        idle_spend_body=encode_slack_message(
+            idle_spend_blocks,
+            f"Idle GPU Spend Alert: {len(RECOMMENDATIONS)} high-severity issues found"
+        ),
+        summary_body=encode_slack_message(
+            summary_blocks,
+            "Heliox Daily Summary: $11234.56 spent yesterday"
+        ),
+    )
+
+
+_SLACK_HOSTS = ("hooks.slack.com",)
+
+
+def _is_slack_webhook(url: str) -> bool:
+    """Check scheme, host and path rather than just a string prefix."""
+    parts = urlsplit(url)
+    return (
+        parts.scheme == "https"
+        and parts.hostname in _SLACK_HOSTS
+        and parts.path.startswith("/services/")
+    )
+
+
+def make_service(webhook_url: str) -> SlackNotificationService:
+    """
+    Build the one service instance shared by every test in this script.
+    
+    Its sends go through SlackNotificationService's pooled HTTP client, so
+    the TCP + TLS handshake to hooks.slack.com is paid once, not per alert.
+    Close it with SlackNotificationService.close_client() when done.
+    """
+    return SlackNotificationService(webhook_url=webhook_url)
+
+
+async def send_burn_rate_alert(service: SlackNotificationService, payloads: SamplePayloads):
+    """Test burn rate alert formatting."""
+    print("\n" + "="*80)
+    print("Testing: 🔥 High Burn Rate Alert")
+    print("="*80)
+    
+    success = await service.send_raw(payloads.burn_rate_body)
     
     if success:
         print("✅ Burn rate alert sent successfully!")
@@ -33,33 +141,16 @@ async def test_burn_rate_alert(webhook_url: str):
     else:
         print("❌ Failed to send burn rate alert")
     
-    return success
+    return "Burn Rate Alert", success
 
 
-async def test_idle_spend_alert(webhook_url: str):
+async def send_idle_spend_alert(service: SlackNotificationService, payloads: SamplePayloads):
     """Test idle spend alert formatting."""
     print("\n" + "="*80)
     print("Testing: ⚠️ Idle Spend Alert")
     print("="*80)
     
-    service = SlackNotificationService(webhook_url=webhook_url)
-    
-    recommendations = [
-        {
-            "title": "Idle GPU: H100 on AWS us-west-2",
-            "description": "H100 GPU has been 100% idle for 14 days. This represents wasted compute capacity and ongoing costs.",
-            "estimated_savings_usd": 1176.00,
-            "severity": "high"
-        },
-        {
-            "title": "Idle GPU: A100 on GCP us-central1",
-            "description": "A100 GPU showing 100% idle time over the past 7 days with zero job executions.",
-            "estimated_savings_usd": 1200.00,
-            "severity": "high"
-        }
-    ]
-    
-    success = await service.send_idle_spend_alert(recommendations)
+    success = await service.send_raw(payloads.idle_spend_body)
     
     if success:
         print("✅ Idle spend alert sent successfully!")
@@ -70,31 +161,16 @@ async def test_idle_spend_alert(webhook_url: str):
     else:
         print("❌ Failed to send idle spend alert")
     
-    return success
+    return "Idle Spend Alert", success
 
 
-async def test_daily_summary(webhook_url: str):
+async def send_daily_summary(service: SlackNotificationService, payloads: SamplePayloads):
     """Test daily summary formatting."""
     print("\n" + "="*80)
     print("Testing: 📊 Daily Summary")
     print("="*80)
     
-    service = SlackNotificationService(webhook_url=webhook_url)
-    
-    top_models = [
-        {"model_name": "Stable Diffusion XL", "cost": 5123.45},
-        {"model_name": "GPT-4", "cost": 3456.78},
-        {"model_name": "BERT-Large", "cost": 1234.56}
-    ]
-    
-    success = await service.send_daily_summary(
-        daily_cost=11234.56,
-        weekly_cost=78456.78,
-        monthly_cost=324567.89,
-        top_models=top_models,
-        high_severity_count=2,
-        total_savings=2376.00
-    )
+    success = await service.send_raw(payloads.summary_body)
     
     if success:
         print("✅ Daily summary sent successfully!")
@@ -106,70 +182,155 @@ async def test_daily_summary(webhook_url: str):
     else:
         print("❌ Failed to send daily summary")
     
-    return success
+    return "Daily Summary", success
+
+
+async def send_all_alerts(service: SlackNotificationService, payloads: SamplePayloads):
+    """Test all three alert formats, combined into a single message."""
+    print("\n" + "="*80)
+    print("Testing: 🔥 Burn Rate + ⚠️ Idle Spend + 📊 Daily Summary (one message)")
+    print("="*80)
+    
+    success = await service.send_combined(
+        [payloads.burn_rate_blocks, payloads.idle_spend_blocks, payloads.summary_blocks],
+        "Heliox alert formatting test"
+    )
+    
+    if success:
+        print("✅ Combined alert message sent successfully!")
+        print("Check your Slack channel for one message with, separated by dividers:")
+        print("  - 🔥 High Burn Rate Alert: $15,234.56 vs $10,000.00 threshold (52.3% over)")
+        print("  - ⚠️ Idle GPU Spend Detected: $2,376.00/month across 2 recommendations")
+        print("  - 📊 Heliox Daily Summary: cost breakdown, top 3 GPU consumers, recommendations")
+    else:
+        print("❌ Failed to send combined alert message")
+    
+    return "All Alerts (combined)", success
+
+
+@pytest_asyncio.fixture(scope="session")
+async def slack_service():
+    """One service for the whole session, so all sends share a pooled connection."""
+    service = make_service(os.environ["SLACK_WEBHOOK_URL"])
+    yield service
+    await SlackNotificationService.close_client()
+
+
+@pytest.fixture(scope="session")
+def sample_payloads(slack_service):
+    """Sample alerts rendered once for the session."""
+    return render_payloads(slack_service)
+
 
+# Session-scoped loop: the pooled HTTP client is bound to the loop it was
+# created on, so the tests must share one loop to reuse it
+@pytest.mark.asyncio(scope="session")
+async def test_burn_rate_alert(slack_service, sample_payloads):
+    _, success = await send_burn_rate_alert(slack_service, sample_payloads)
+    assert success
 
-async def main():
-    """Main test function."""
+
+@pytest.mark.asyncio(scope="session")
+async def test_idle_spend_alert(slack_service, sample_payloads):
+    _, success = await send_idle_spend_alert(slack_service, sample_payloads)
+    assert success
+
+
+@pytest.mark.asyncio(scope="session")
+async def test_daily_summary(slack_service, sample_payloads):
+    _, success = await send_daily_summary(slack_service, sample_payloads)
+    assert success
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(
+        description="Send sample Heliox alerts to a Slack webhook to verify formatting."
+    )
+    parser.add_argument(
+        "--webhook-url",
+        help="Slack webhook URL (defaults to the SLACK_WEBHOOK_URL environment variable)"
+    )
+    parser.add_argument(
+        "-y", "--yes",
+        action="store_true",
+        help="Don't ask for confirmation before sending"
+    )
+    return parser.parse_args(argv)
+
+
+async def main(argv=None) -> bool:
+    """
+    Main test function.
+    
+    Runs non-interactively when the webhook URL comes from --webhook-url or
+    SLACK_WEBHOOK_URL; only prompts when attached to a terminal.
+    
+    Returns:
+        True if every alert was sent
+    """
+    args = parse_args(argv)
+    interactive = sys.stdin.isatty() and not args.yes
+    
     print("\n" + "╔" + "="*78 + "╗")
     print("║" + " "*78 + "║")
     print("║" + "  🧪 SLACK ALERT FORMATTING TEST  ".center(78) + "║")
     print("║" + " "*78 + "║")
     print("╚" + "="*78 + "╝")
     
-    # Get webhook URL from user
-    print("\n📝 Instructions:")
-    print("   1. Go to your Slack workspace")
-    print("   2. Create a test channel (e.g., #heliox-alerts-test)")
-    print("   3. Go to https://api.slack.com/messaging/webhooks")
-    print("   4. Click 'Create New App' → 'From scratch'")
-    print("   5. Name it 'Heliox Alerts' and select your workspace")
-    print("   6. Click 'Incoming Webhooks' → Enable it")
-    print("   7. Click 'Add New Webhook to Workspace'")
-    print("   8. Select your test channel")
-    print("   9. Copy the webhook URL\n")
+    webhook_url = (args.webhook_url or os.environ.get("SLACK_WEBHOOK_URL") or "").strip()
     
-    webhook_url = input("🔗 Enter your Slack webhook URL: ").strip()
+    # Fall back to asking the user, only when there is someone to ask
+    if not webhook_url and interactive:
+        print("\n📝 Instructions:")
+        print("   1. Go to your Slack workspace")
+        print("   2. Create a test channel (e.g., #heliox-alerts-test)")
+        print("   3. Go to https://api.slack.com/messaging/webhooks")
+        print("   4. Click 'Create New App' → 'From scratch'")
+        print("   5. Name it 'Heliox Alerts' and select your workspace")
+        print("   6. Click 'Incoming Webhooks' → Enable it")
+        print("   7. Click 'Add New Webhook to Workspace'")
+        print("   8. Select your test channel")
+        print("   9. Copy the webhook URL\n")
+        
+        webhook_url = input("🔗 Enter your Slack webhook URL: ").strip()
     
     if not webhook_url:
-        print("❌ No webhook URL provided. Exiting.")
-        return
+        print("❌ No webhook URL provided (use --webhook-url or SLACK_WEBHOOK_URL). Exiting.")
+        return False
     
-    if not webhook_url.startswith("https://hooks.slack.com/"):
+    if not _is_slack_webhook(webhook_url):
         print("⚠️  Warning: URL doesn't look like a Slack webhook URL")
-        proceed = input("   Continue anyway? (y/n): ").strip().lower()
-        if proceed != 'y':
-            return
+        if interactive:
+            proceed = input("   Continue anyway? (y/n): ").strip().lower()
+            if proceed != 'y':
+                return False
+        elif not args.yes:
+            print("   Pass --yes to send anyway.")
+            return False
     
     print("\n🚀 Starting tests...")
-    print("   This will send 3 test messages to your Slack channel")
-    input("   Press Enter to continue...")
-    
-    # Run tests
-    results = []
-    
-    # Test 1: Burn Rate Alert
-    results.append(await test_burn_rate_alert(webhook_url))
-    await asyncio.sleep(2)  # Pause between messages
+    print("   This will send 1 test message (all 3 alerts) to your Slack channel")
+    if interactive:
+        input("   Press Enter to continue...")
     
-    # Test 2: Idle Spend Alert
-    results.append(await test_idle_spend_alert(webhook_url))
-    await asyncio.sleep(2)
-    
-    # Test 3: Daily Summary
-    results.append(await test_daily_summary(webhook_url))
+    # All three alerts go out as one message: a single POST to Slack
+    service = make_service(webhook_url)
+    try:
+        results = [await send_all_alerts(service, render_payloads(service))]
+    finally:
+        await SlackNotificationService.close_client()
     
     # Summary
     print("\n" + "="*80)
     print("📊 TEST RESULTS SUMMARY")
     print("="*80)
     
-    test_names = ["Burn Rate Alert", "Idle Spend Alert", "Daily Summary"]
-    for i, (name, success) in enumerate(zip(test_names, results), 1):
+    for i, (name, success) in enumerate(results, 1):
         status = "✅ PASS" if success else "❌ FAIL"
         print(f"{i}. {name}: {status}")
     
-    passed = sum(results)
+    passed = sum(success for _, success in results)
     total = len(results)
     
     print(f"\n{'✅' if passed == total else '⚠️'} {passed}/{total} tests passed")
@@ -184,15 +345,21 @@ async def main():
         print("   3. Alerts will be sent automatically based on schedule")
     else:
         print("\n⚠️ Some tests failed. Check the error messages above.")
+    
+    return passed == total
 
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        all_passed = asyncio.run(main())
     except KeyboardInterrupt:
         print("\n\n❌ Test interrupted by user")
+        all_passed = False
     except Exception as e:
         print(f"\n\n❌ Test failed with error: {e}")
         import traceback
         traceback.print_exc()
+        all_passed = False
+    
+    sys.exit(0 if all_passed else 1)
 
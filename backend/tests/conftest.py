@@ -0,0 +1,93 @@
+"""Shared pytest fixtures."""
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+import app.models  # noqa: F401  (registers all models on Base.metadata)
+import app.models.alert_settings  # noqa: F401
+from app.models.base import Base
+
+
+@pytest.fixture(scope="session")
+def db_engine():
+    """
+    Create the test database schema once per test run.
+    
+    Under pytest-xdist each worker is its own process, so every worker
+    gets a private in-memory database.
+    """
+    # One in-memory database shared by every connection: no disk I/O on commit
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    
+    @event.listens_for(engine, "connect")
+    def _configure_sqlite(dbapi_connection, connection_record):
+        # pysqlite's own transaction handling doesn't support SAVEPOINT;
+        # let SQLAlchemy emit BEGIN itself so nested transactions work
+        dbapi_connection.isolation_level = None
+        
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.execute("PRAGMA journal_mode=MEMORY")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+    
+    @event.listens_for(engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+    
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(scope="module")
+def db_connection(db_engine):
+    """
+    Connection holding one outer transaction for a whole test module.
+    
+    Module-scoped seed data is written inside it and rolled back once the
+    module finishes, so modules never see each other's rows.
+    """
+    connection = db_engine.connect()
+    transaction = connection.begin()
+    yield connection
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture(scope="module")
+def module_db_session(db_connection):
+    """
+    Session for seeding data shared by every test in a module.
+    
+    Seeded objects stay loaded after commit: reading an expired attribute
+    would open a new savepoint inside whichever test touched it, and that
+    test's rollback would then pull the savepoint out from under this session.
+    """
+    session = Session(
+        bind=db_connection,
+        join_transaction_mode="create_savepoint",
+        expire_on_commit=False
+    )
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def db_session(db_connection):
+    """
+    Per-test session running inside a SAVEPOINT.
+    
+    Commits only release the savepoint, and everything the test wrote is
+    rolled back when the session closes, leaving the module's seed data intact.
+    """
+    savepoint = db_connection.begin_nested()
+    session = Session(bind=db_connection, join_transaction_mode="create_savepoint")
+    yield session
+    session.close()
+    savepoint.rollback()
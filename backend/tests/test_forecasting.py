@@ -1,61 +1,76 @@
 """Tests for forecasting service."""
+import numpy as np
 import pytest
 from datetime import date, timedelta
 from decimal import Decimal
 
 from app.services.forecasting import ForecastingService
 from app.models.cost import CostSnapshot, UsageSnapshot
-from app.models.team import Team
 
 
-@pytest.fixture
-def db_with_usage_data(db_session):
-    """Create test database with usage data."""
-    # Create 14 days of usage data
+@pytest.fixture(scope="module")
+def db_with_usage_data(module_db_session):
+    """Create test database with usage data, once for the whole module."""
+    # Create 14 days of usage data in one multi-row INSERT
     start_date = date(2026, 1, 1)
-    for i in range(14):
-        current_date = start_date + timedelta(days=i)
-        usage = UsageSnapshot(
-            date=current_date,
-            provider="aws",
-            gpu_type="a100",
-            gpu_hours=Decimal(str(100 + i * 5))  # Increasing trend
-        )
-        db_session.add(usage)
-    
-    db_session.commit()
-    return db_session
+    rows = [
+        {
+            "date": start_date + timedelta(days=i),
+            "provider": "aws",
+            "gpu_type": "a100",
+            "gpu_hours": Decimal(100 + i * 5)  # Increasing trend
+        }
+        for i in range(14)
+    ]
+    module_db_session.bulk_insert_mappings(UsageSnapshot, rows)
+    module_db_session.commit()
+    return module_db_session
+
+
+@pytest.fixture(scope="module")
+def usage_forecast_7d(db_with_usage_data):
+    """7-day aws/a100 usage forecast, computed once and shared by read-only tests."""
+    service = ForecastingService(db_with_usage_data, redis_client=None)
+    return service.forecast_usage(provider="aws", gpu_type="a100", horizon_days=7)
+
+
+def _forecast_arrays(result):
+    """Forecast values and bounds as NumPy arrays: (value, lower_bound, upper_bound)."""
+    forecast = result["forecast"]
+    return tuple(
+        np.fromiter((point[key] for point in forecast), dtype=np.float64, count=len(forecast))
+        for key in ("value", "lower_bound", "upper_bound")
+    )
 
 
 @pytest.fixture
 def db_with_cost_data(db_session):
     """Create test database with cost data."""
-    # Create 14 days of cost data
+    # Create 14 days of cost data in one multi-row INSERT
     start_date = date(2026, 1, 1)
-    for i in range(14):
-        current_date = start_date + timedelta(days=i)
-        cost = CostSnapshot(
-            date=current_date,
-            provider="aws",
-            gpu_type="a100",
-            cost_usd=Decimal(str(1000 + i * 50))  # Increasing trend
-        )
-        db_session.add(cost)
-    
+    rows = [
+        {
+            "date": start_date + timedelta(days=i),
+            "provider": "aws",
+            "gpu_type": "a100",
+            "cost_usd": Decimal(1000 + i * 50)  # Increasing trend
+        }
+        for i in range(14)
+    ]
+    db_session.bulk_insert_mappings(CostSnapshot, rows)
     db_session.commit()
     return db_session
 
 
-def test_forecast_usage_shape(db_with_usage_data):
-    """Test that usage forecast returns correct shape."""
-    service = ForecastingService(db_with_usage_data, redis_client=None)
-    
-    result = service.forecast_usage(
-        provider="aws",
-        gpu_type="a100",
-        horizon_days=7
-    )
-    
+@pytest.fixture
+def spend_forecast_7d(db_with_cost_data):
+    """7-day aws/a100 spend forecast."""
+    service = ForecastingService(db_with_cost_data, redis_client=None)
+    return service.forecast_spend(provider="aws", gpu_type="a100", horizon_days=7)
+
+
+def _assert_forecast_shape(result, horizon):
+    """Assert the response structure shared by usage and spend forecasts."""
     # Check response structure
     assert "historical" in result
     assert "forecast" in result
@@ -70,7 +85,7 @@ def test_forecast_usage_shape(db_with_usage_data):
         assert point["value"] >= 0
     
     # Check forecast data
-    assert len(result["forecast"]) == 7
+    assert len(result["forecast"]) == horizon
     for point in result["forecast"]:
         assert "date" in point
         assert "value" in point
@@ -81,39 +96,12 @@ def test_forecast_usage_shape(db_with_usage_data):
         assert point["upper_bound"] >= point["value"]
 
 
-def test_forecast_spend_shape(db_with_cost_data):
-    """Test that spend forecast returns correct shape."""
-    service = ForecastingService(db_with_cost_data, redis_client=None)
-    
-    result = service.forecast_spend(
-        provider="aws",
-        gpu_type="a100",
-        horizon_days=7
-    )
-    
-    # Check response structure
-    assert "historical" in result
-    assert "forecast" in result
-    assert "metadata" in result
-    assert "forecast_method" in result
+@pytest.mark.parametrize("forecast_fixture", ["usage_forecast_7d", "spend_forecast_7d"])
+def test_forecast_shape(forecast_fixture, request):
+    """Test that usage and spend forecasts return the correct shape."""
+    result = request.getfixturevalue(forecast_fixture)
     
-    # Check historical data
-    assert len(result["historical"]) == 14
-    for point in result["historical"]:
-        assert "date" in point
-        assert "value" in point
-        assert point["value"] >= 0
-    
-    # Check forecast data
-    assert len(result["forecast"]) == 7
-    for point in result["forecast"]:
-        assert "date" in point
-        assert "value" in point
-        assert "lower_bound" in point
-        assert "upper_bound" in point
-        assert point["value"] >= 0
-        assert point["lower_bound"] >= 0
-        assert point["upper_bound"] >= point["value"]
+    _assert_forecast_shape(result, horizon=7)
 
 
 def test_forecast_insufficient_data(db_session):
@@ -121,20 +109,21 @@ def test_forecast_insufficient_data(db_session):
     service = ForecastingService(db_session, redis_client=None)
     
     # Add only 3 days of data (less than MIN_DATA_POINTS_FOR_FORECAST=7)
+    # for a GPU type the module-scoped aws/a100 seed doesn't cover
     start_date = date(2026, 1, 1)
     for i in range(3):
         current_date = start_date + timedelta(days=i)
         usage = UsageSnapshot(
             date=current_date,
             provider="aws",
-            gpu_type="a100",
+            gpu_type="h100",
             gpu_hours=Decimal("100")
         )
         db_session.add(usage)
     
     db_session.commit()
     
-    result = service.forecast_usage(provider="aws", gpu_type="a100", horizon_days=7)
+    result = service.forecast_usage(provider="aws", gpu_type="h100", horizon_days=7)
     
     # Should return error
     assert "error" in result
@@ -155,15 +144,9 @@ def test_forecast_horizon_validation(db_with_usage_data):
         assert len(result["forecast"]) == horizon
 
 
-def test_forecast_trend_detection(db_with_usage_data):
+def test_forecast_trend_detection(usage_forecast_7d):
     """Test that forecast detects increasing trend."""
-    service = ForecastingService(db_with_usage_data, redis_client=None)
-    
-    result = service.forecast_usage(
-        provider="aws",
-        gpu_type="a100",
-        horizon_days=7
-    )
+    result = usage_forecast_7d
     
     # Last historical value
     last_historical = result["historical"][-1]["value"]
@@ -176,28 +159,15 @@ def test_forecast_trend_detection(db_with_usage_data):
     assert first_forecast >= last_historical * 0.9  # Allow some variation
 
 
-def test_forecast_confidence_bands_widen(db_with_usage_data):
+def test_forecast_confidence_bands_widen(usage_forecast_7d):
     """Test that confidence bands widen over forecast horizon."""
-    service = ForecastingService(db_with_usage_data, redis_client=None)
+    _, lower, upper = _forecast_arrays(usage_forecast_7d)
     
-    result = service.forecast_usage(
-        provider="aws",
-        gpu_type="a100",
-        horizon_days=7
-    )
-    
-    # Calculate band width for first and last forecast
-    first_band_width = (
-        result["forecast"][0]["upper_bound"] - 
-        result["forecast"][0]["lower_bound"]
-    )
-    last_band_width = (
-        result["forecast"][-1]["upper_bound"] - 
-        result["forecast"][-1]["lower_bound"]
-    )
+    # Calculate band width for every forecast point
+    band_width = upper - lower
     
     # Last forecast should have wider confidence band
-    assert last_band_width >= first_band_width
+    assert band_width[-1] >= band_width[0]
 
 
 def test_forecast_caching(db_with_usage_data):
@@ -222,32 +192,19 @@ def test_forecast_caching(db_with_usage_data):
     assert len(result1["forecast"]) == len(result2["forecast"])
 
 
-def test_forecast_non_negative(db_with_usage_data):
+def test_forecast_non_negative(usage_forecast_7d):
     """Test that forecast values are never negative."""
-    service = ForecastingService(db_with_usage_data, redis_client=None)
-    
-    result = service.forecast_usage(
-        provider="aws",
-        gpu_type="a100",
-        horizon_days=7
-    )
+    values, lower, upper = _forecast_arrays(usage_forecast_7d)
     
     # Check all forecast values and bounds are non-negative
-    for point in result["forecast"]:
-        assert point["value"] >= 0
-        assert point["lower_bound"] >= 0
-        assert point["upper_bound"] >= 0
+    assert (values >= 0).all()
+    assert (lower >= 0).all()
+    assert (upper >= 0).all()
 
 
-def test_forecast_metadata(db_with_usage_data):
+def test_forecast_metadata(usage_forecast_7d):
     """Test that forecast includes correct metadata."""
-    service = ForecastingService(db_with_usage_data, redis_client=None)
-    
-    result = service.forecast_usage(
-        provider="aws",
-        gpu_type="a100",
-        horizon_days=7
-    )
+    result = usage_forecast_7d
     
     # Check metadata
     assert result["metadata"]["historical_data_points"] == 14
@@ -257,25 +214,10 @@ def test_forecast_metadata(db_with_usage_data):
     assert result["gpu_type"] == "a100"
 
 
-def test_forecast_method_selection(db_session):
+def test_forecast_method_selection(usage_forecast_7d):
     """Test that correct forecast method is selected based on data size."""
-    service = ForecastingService(db_session, redis_client=None)
-    
-    # Add 14 days of data (less than MIN_DATA_POINTS_FOR_ML=30)
-    start_date = date(2026, 1, 1)
-    for i in range(14):
-        current_date = start_date + timedelta(days=i)
-        usage = UsageSnapshot(
-            date=current_date,
-            provider="aws",
-            gpu_type="a100",
-            gpu_hours=Decimal(str(100 + i * 5))
-        )
-        db_session.add(usage)
-    
-    db_session.commit()
-    
-    result = service.forecast_usage(provider="aws", gpu_type="a100", horizon_days=7)
+    # The module seed has 14 days of data (less than MIN_DATA_POINTS_FOR_ML=30)
+    result = usage_forecast_7d
     
     # Should use moving_average for < 30 days
     assert result["forecast_method"] == "moving_average"
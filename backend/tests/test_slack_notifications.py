@@ -1,15 +1,35 @@
 """Tests for Slack notification service."""
+import httpx
 import pytest
+from contextlib import asynccontextmanager
+from datetime import date
 from unittest.mock import Mock, patch, AsyncMock
-from datetime import date, timedelta
+from types import SimpleNamespace
 
 from app.services.slack_notifications import (
     SlackNotificationService,
     check_and_send_burn_rate_alert,
     check_and_send_idle_spend_alert,
     send_daily_summary_report,
-    BURN_RATE_THRESHOLD_USD
+    encode_slack_message,
+    _backoff_delay,
+    BURN_RATE_THRESHOLD_USD,
+    SLACK_BACKOFF_BASE,
+    SLACK_BACKOFF_CAP,
+    SLACK_BACKOFF_JITTER
 )
+from app.schemas.recommendation import RecommendationType
+
+# _format_currency is deterministic, so its expected output is a fixed table
+FORMATTED_CURRENCY = {
+    0: "$0.00",
+    1000: "$1,000.00",
+    1234.56: "$1,234.56",
+    1500: "$1,500.00",
+    5000: "$5,000.00",
+    10000: "$10,000.00",
+    15000: "$15,000.00",
+}
 
 
 @pytest.fixture
@@ -26,6 +46,32 @@ def mock_slack_service_disabled():
     return service
 
 
+@pytest.fixture(scope="module")
+def sample_recommendations():
+    """Idle GPU recommendations shared read-only by the block builder tests."""
+    return [
+        {
+            "title": "Idle GPU: H100",
+            "description": "100% idle for 14 days",
+            "estimated_savings_usd": 1000
+        },
+        {
+            "title": "Idle GPU: A100",
+            "description": "80% idle for 7 days",
+            "estimated_savings_usd": 500
+        }
+    ]
+
+
+@pytest.fixture(scope="module")
+def sample_top_models():
+    """Top models by cost shared read-only by the block builder tests."""
+    return [
+        {"model_name": "Stable Diffusion XL", "cost": 5000},
+        {"model_name": "GPT-4", "cost": 3000}
+    ]
+
+
 def test_slack_service_initialization(mock_slack_service, mock_slack_service_disabled):
     """Test Slack service initialization."""
     assert mock_slack_service.enabled is True
@@ -42,11 +88,10 @@ def test_mask_webhook_url(mock_slack_service):
     assert len(masked) < len(url)
 
 
-def test_format_currency(mock_slack_service):
+@pytest.mark.parametrize("amount,expected", FORMATTED_CURRENCY.items())
+def test_format_currency(mock_slack_service, amount, expected):
     """Test currency formatting."""
-    assert mock_slack_service._format_currency(1000) == "$1,000.00"
-    assert mock_slack_service._format_currency(1234.56) == "$1,234.56"
-    assert mock_slack_service._format_currency(0) == "$0.00"
+    assert mock_slack_service._format_currency(amount) == expected
 
 
 def test_create_burn_rate_alert_blocks(mock_slack_service):
@@ -60,45 +105,27 @@ def test_create_burn_rate_alert_blocks(mock_slack_service):
     assert len(blocks) >= 3
     assert blocks[0]["type"] == "header"
     assert "High Burn Rate" in blocks[0]["text"]["text"]
-    assert "$15,000.00" in blocks[1]["text"]["text"]
+    assert FORMATTED_CURRENCY[15000] in blocks[1]["text"]["text"]
     assert "50.0%" in blocks[1]["text"]["text"]  # 50% over threshold
 
 
-def test_create_idle_spend_alert_blocks(mock_slack_service):
+def test_create_idle_spend_alert_blocks(mock_slack_service, sample_recommendations):
     """Test idle spend alert block creation."""
-    recommendations = [
-        {
-            "title": "Idle GPU: H100",
-            "description": "100% idle for 14 days",
-            "estimated_savings_usd": 1000
-        },
-        {
-            "title": "Idle GPU: A100",
-            "description": "80% idle for 7 days",
-            "estimated_savings_usd": 500
-        }
-    ]
-    
-    blocks = mock_slack_service._create_idle_spend_alert_blocks(recommendations)
+    blocks = mock_slack_service._create_idle_spend_alert_blocks(sample_recommendations)
     
     assert len(blocks) >= 4
     assert blocks[0]["type"] == "header"
     assert "Idle GPU" in blocks[0]["text"]["text"]
-    assert "$1,500.00" in blocks[1]["text"]["text"]  # Total savings
+    assert FORMATTED_CURRENCY[1500] in blocks[1]["text"]["text"]  # Total savings
 
 
-def test_create_daily_summary_blocks(mock_slack_service):
+def test_create_daily_summary_blocks(mock_slack_service, sample_top_models):
     """Test daily summary block creation."""
-    top_models = [
-        {"model_name": "Stable Diffusion XL", "cost": 5000},
-        {"model_name": "GPT-4", "cost": 3000}
-    ]
-    
     blocks = mock_slack_service._create_daily_summary_blocks(
         daily_cost=10000,
         weekly_cost=60000,
         monthly_cost=250000,
-        top_models=top_models,
+        top_models=sample_top_models,
         high_severity_count=3,
         total_savings=2000
     )
@@ -106,48 +133,217 @@ def test_create_daily_summary_blocks(mock_slack_service):
     assert len(blocks) >= 3
     assert blocks[0]["type"] == "header"
     assert "Daily Summary" in blocks[0]["text"]["text"]
-    assert "$10,000.00" in str(blocks)
-    assert "Stable Diffusion XL" in str(blocks)
+    
+    # Cost fields come first, then a divider and title before the model lines
+    cost_fields = blocks[1]["fields"]
+    assert cost_fields[0]["text"] == f"*Yesterday:*\n{FORMATTED_CURRENCY[10000]}"
+    top_model_text = blocks[4]["text"]["text"]
+    assert "Stable Diffusion XL" in top_model_text
+    assert FORMATTED_CURRENCY[5000] in top_model_text
 
 
-@pytest.mark.asyncio
+def _status_sequence_handler(*statuses):
+    """
+    MockTransport handler answering with the given statuses in order.
+    
+    The last status repeats once the sequence is exhausted; handler.calls
+    counts the requests received and handler.last_request keeps the latest.
+    """
+    def handler(request):
+        status = statuses[min(handler.calls, len(statuses) - 1)]
+        handler.calls += 1
+        handler.last_request = request
+        return httpx.Response(status)
+    
+    handler.calls = 0
+    handler.last_request = None
+    return handler
+
+
+@asynccontextmanager
+async def _shared_mock_client(handler):
+    """
+    Install a MockTransport-backed client as the service's shared client.
+    
+    For senders that don't take a client argument (e.g. send_burn_rate_alert).
+    The shared client is closed on exit so none outlives the test's loop.
+    """
+    SlackNotificationService._client = httpx.AsyncClient(
+        transport=httpx.MockTransport(handler)
+    )
+    try:
+        yield
+    finally:
+        await SlackNotificationService.close_client()
+
+
+@pytest.mark.asyncio(scope="module")
 async def test_send_slack_message_success(mock_slack_service):
     """Test successful Slack message sending."""
     blocks = [{"type": "section", "text": {"type": "plain_text", "text": "Test"}}]
+    handler = _status_sequence_handler(200)
     
-    with patch("httpx.AsyncClient.post", new_callable=AsyncMock) as mock_post:
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_post.return_value = mock_response
-        
-        result = await mock_slack_service._send_slack_message(blocks, "Test message")
-        
-        assert result is True
-        assert mock_post.called
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        result = await mock_slack_service._send_slack_message(
+            blocks, "Test message", client=client
+        )
+    
+    assert result is True
+    assert handler.calls == 1
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(scope="module")
 async def test_send_slack_message_retry(mock_slack_service):
     """Test Slack message sending with retries."""
     blocks = [{"type": "section", "text": {"type": "plain_text", "text": "Test"}}]
     
-    with patch("httpx.AsyncClient.post", new_callable=AsyncMock) as mock_post:
-        # Fail twice, then succeed
-        mock_response_fail = Mock()
-        mock_response_fail.status_code = 500
-        mock_response_success = Mock()
-        mock_response_success.status_code = 200
-        
-        mock_post.side_effect = [mock_response_fail, mock_response_fail, mock_response_success]
-        
-        with patch("asyncio.sleep", new_callable=AsyncMock):
-            result = await mock_slack_service._send_slack_message(blocks, "Test message")
-        
-        assert result is True
-        assert mock_post.call_count == 3
-
-
-@pytest.mark.asyncio
+    # Fail twice, then succeed
+    handler = _status_sequence_handler(500, 500, 200)
+    
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        result = await mock_slack_service._send_slack_message(
+            blocks, "Test message", sleep=AsyncMock(), client=client
+        )
+    
+    assert result is True
+    assert handler.calls == 3
+
+
+@pytest.mark.asyncio(scope="module")
+async def test_send_slack_message_no_retry_on_client_error(mock_slack_service):
+    """Test that unrecoverable 4xx responses are not retried."""
+    blocks = [{"type": "section", "text": {"type": "plain_text", "text": "Test"}}]
+    
+    handler = _status_sequence_handler(404)
+    mock_sleep = AsyncMock()
+    
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        result = await mock_slack_service._send_slack_message(
+            blocks, "Test message", sleep=mock_sleep, client=client
+        )
+    
+    assert result is False
+    assert handler.calls == 1
+    assert not mock_sleep.called
+
+
+@pytest.mark.asyncio(scope="module")
+async def test_send_slack_message_honors_retry_after(mock_slack_service):
+    """Test that a 429 waits for Slack's Retry-After before retrying."""
+    blocks = [{"type": "section", "text": {"type": "plain_text", "text": "Test"}}]
+    
+    responses = [
+        httpx.Response(429, headers={"Retry-After": "3"}),
+        httpx.Response(200),
+    ]
+    requests = []
+    
+    def handler(request):
+        requests.append(request)
+        return responses[len(requests) - 1]
+    
+    mock_sleep = AsyncMock()
+    
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        result = await mock_slack_service._send_slack_message(
+            blocks, "Test message", sleep=mock_sleep, client=client
+        )
+    
+    assert result is True
+    assert len(requests) == 2
+    mock_sleep.assert_awaited_once_with(3.0)
+
+
+@pytest.mark.asyncio(scope="module")
+async def test_send_burn_rate_alert_deduplicated(mock_slack_service):
+    """Test that an alert already sent for the same date is not posted again."""
+    mock_redis = Mock()
+    mock_redis.set.return_value = None  # SET NX: key already exists
+    handler = _status_sequence_handler(200)
+    
+    async with _shared_mock_client(handler):
+        with patch("app.services.slack_notifications.get_redis", return_value=mock_redis):
+            result = await mock_slack_service.send_burn_rate_alert(15000, 10000, "2026-01-09")
+    
+    assert result is True
+    assert handler.calls == 0
+    mock_redis.set.assert_called_once_with("slack:burn:2026-01-09", "1", nx=True, ex=86400)
+
+
+@pytest.mark.asyncio(scope="module")
+async def test_send_burn_rate_alert_releases_key_on_failure(mock_slack_service):
+    """Test that a failed send releases its idempotency key so a retry can resend."""
+    mock_redis = Mock()
+    mock_redis.set.return_value = True
+    handler = _status_sequence_handler(404)
+    
+    async with _shared_mock_client(handler):
+        with patch("app.services.slack_notifications.get_redis", return_value=mock_redis):
+            result = await mock_slack_service.send_burn_rate_alert(15000, 10000, "2026-01-09")
+    
+    assert result is False
+    assert handler.calls == 1
+    mock_redis.delete.assert_called_once_with("slack:burn:2026-01-09")
+
+
+@pytest.mark.asyncio(scope="module")
+async def test_send_raw_posts_pre_encoded_body(mock_slack_service):
+    """Test that a pre-encoded message body is posted as-is."""
+    blocks = [{"type": "section", "text": {"type": "plain_text", "text": "Test"}}]
+    body = encode_slack_message(blocks, "Test message")
+    
+    handler = _status_sequence_handler(200)
+    
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        result = await mock_slack_service.send_raw(body, client=client)
+    
+    assert result is True
+    assert handler.last_request.content == body
+    assert handler.last_request.headers["content-type"] == "application/json"
+
+
+def test_backoff_delay_capped_with_jitter():
+    """Test that retry delays grow exponentially, stay jittered and never exceed the cap."""
+    for attempt in range(1, 10):
+        expected = min(SLACK_BACKOFF_CAP, SLACK_BACKOFF_BASE * 2 ** attempt)
+        with patch("random.random", return_value=0.0):
+            assert _backoff_delay(attempt) == pytest.approx(expected * (1 - SLACK_BACKOFF_JITTER))
+        with patch("random.random", return_value=1.0):
+            assert _backoff_delay(attempt) == pytest.approx(expected)
+        assert _backoff_delay(attempt) <= SLACK_BACKOFF_CAP
+
+
+@pytest.mark.asyncio(scope="module")
+async def test_send_combined_joins_sections_with_dividers(mock_slack_service):
+    """Test that combined sections go out as one message separated by dividers."""
+    section = [{"type": "section", "text": {"type": "plain_text", "text": "Test"}}]
+    
+    with patch.object(
+        mock_slack_service, "_send_slack_message", new_callable=AsyncMock
+    ) as mock_send:
+        mock_send.return_value = True
+        result = await mock_slack_service.send_combined([section, section], "Test message")
+    
+    assert result is True
+    blocks = mock_send.call_args.args[0]
+    assert [block["type"] for block in blocks] == ["section", "divider", "section"]
+
+
+@pytest.mark.asyncio(scope="module")
+async def test_send_combined_rejects_too_many_blocks(mock_slack_service):
+    """Test that messages over Slack's block limit are not sent."""
+    section = [{"type": "divider"}] * 30
+    
+    with patch.object(
+        mock_slack_service, "_send_slack_message", new_callable=AsyncMock
+    ) as mock_send:
+        result = await mock_slack_service.send_combined([section, section], "Test message")
+    
+    assert result is False
+    assert not mock_send.called
+
+
+@pytest.mark.asyncio(scope="module")
 async def test_send_slack_message_disabled(mock_slack_service_disabled):
     """Test Slack message sending when disabled."""
     blocks = [{"type": "section", "text": {"type": "plain_text", "text": "Test"}}]
@@ -157,21 +353,76 @@ async def test_send_slack_message_disabled(mock_slack_service_disabled):
     assert result is False
 
 
-def test_check_burn_rate_alert_output_shape(db_session):
-    """Test burn rate alert function output shape."""
-    # This test would require setting up test data in db_session
-    # For now, just ensure the function exists and can be called
-    assert callable(check_and_send_burn_rate_alert)
+@pytest.mark.asyncio(scope="module")
+async def test_send_alert_disabled_skips_block_building(mock_slack_service_disabled):
+    """Test that a disabled service returns before building any blocks."""
+    with patch.object(
+        mock_slack_service_disabled, "_create_burn_rate_alert_blocks"
+    ) as mock_blocks:
+        result = await mock_slack_service_disabled.send_burn_rate_alert(15000, 10000, "2026-01-09")
+    
+    assert result is False
+    assert not mock_blocks.called
+
+
+@pytest.mark.asyncio(scope="module")
+async def test_check_burn_rate_alert_disabled_skips_db():
+    """Test that checks don't query the database when Slack is not configured."""
+    db = Mock()
+    
+    with patch("app.services.slack_notifications.settings") as mock_settings:
+        mock_settings.SLACK_WEBHOOK_URL = None
+        result = await check_and_send_burn_rate_alert(db, "2026-01-09")
+    
+    assert result is False
+    assert not db.execute.called
 
 
-def test_check_idle_spend_alert_output_shape(db_session):
-    """Test idle spend alert function output shape."""
-    assert callable(check_and_send_idle_spend_alert)
+@pytest.mark.asyncio(scope="module")
+async def test_idle_spend_alert_filters_shared_scan():
+    """Test that a pre-computed scan is filtered to idle GPU recommendations, not rerun."""
+    idle = SimpleNamespace(type=RecommendationType.IDLE_GPU, model_dump=lambda: {"title": "idle"})
+    other = SimpleNamespace(type=RecommendationType.OFF_HOURS_USAGE, model_dump=lambda: {"title": "other"})
+    
+    with patch("app.services.slack_notifications.settings") as mock_settings, \
+         patch("app.services.slack_notifications.scan_high_severity_recommendations") as mock_scan, \
+         patch.object(
+             SlackNotificationService, "send_idle_spend_alert", new_callable=AsyncMock
+         ) as mock_send:
+        mock_settings.SLACK_WEBHOOK_URL = "https://hooks.slack.com/test"
+        mock_send.return_value = True
+        result = await check_and_send_idle_spend_alert(Mock(), [idle, other])
+    
+    assert result is True
+    assert not mock_scan.called
+    mock_send.assert_awaited_once_with([{"title": "idle"}])
+
+
+@pytest.mark.asyncio(scope="module")
+async def test_idle_spend_alert_standalone_scans_idle_only():
+    """Test that without a shared scan only the idle GPU detector runs, through today."""
+    with patch("app.services.slack_notifications.settings") as mock_settings, \
+         patch("app.services.slack_notifications.scan_high_severity_recommendations") as mock_scan:
+        mock_settings.SLACK_WEBHOOK_URL = "https://hooks.slack.com/test"
+        mock_scan.return_value = []
+        db = Mock()
+        result = await check_and_send_idle_spend_alert(db)
+    
+    assert result is False
+    mock_scan.assert_called_once_with(
+        db,
+        end_date=date.today(),
+        types=[RecommendationType.IDLE_GPU]
+    )
 
 
-def test_send_daily_summary_report_output_shape(db_session):
-    """Test daily summary report function output shape."""
-    assert callable(send_daily_summary_report)
+@pytest.mark.parametrize(
+    "fn",
+    [check_and_send_burn_rate_alert, check_and_send_idle_spend_alert, send_daily_summary_report]
+)
+def test_check_functions_exported(fn):
+    """Test that the scheduled check functions exist and can be called."""
+    assert callable(fn)
 
 
 def test_burn_rate_threshold_configured():